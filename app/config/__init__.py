@@ -1,28 +1,152 @@
 # app/config/__init__.py
-from pydantic import BaseModel
+import json
+from pydantic import BaseModel, ConfigDict
 from functools import lru_cache
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, Callable, Dict
 
-from .auth import AuthSettings
-from .documents import DocumentSettings
-from .embeddings import EmbeddingSettings
-from .environment import EnvironmentSettings
-from .llm import LLMSettings
-from .logging import LoggingSettings
-from .redis import RedisSettings
-from .vectors import VectorSettings
+from .base import BaseAppSettings, get_env_files, read_env_file
+
+if TYPE_CHECKING:
+    from .auth import AuthSettings
+    from .documents import DocumentSettings
+    from .embeddings import EmbeddingSettings
+    from .environment import Environment, EnvironmentSettings
+    from .llm import LLMSettings
+    from .logging import LoggingSettings
+    from .redis import RedisSettings
+    from .vectors import VectorSettings
+
+
+# Section modules are imported on first use, so a process only builds the
+# pydantic schemas of the sections it actually touches.
+_LAZY_ATTRIBUTES = {
+    "Environment": ".environment",
+    "EnvironmentSettings": ".environment",
+    "AuthSettings": ".auth",
+    "DocumentSettings": ".documents",
+    "EmbeddingSettings": ".embeddings",
+    "VectorSettings": ".vectors",
+    "LLMSettings": ".llm",
+    "RedisSettings": ".redis",
+    "LoggingSettings": ".logging",
+}
+
+
+@lru_cache(maxsize=1)
+def get_environment_settings() -> "EnvironmentSettings":
+    """Get cached environment settings."""
+    from .environment import EnvironmentSettings
+    return EnvironmentSettings.load()
+
+
+@lru_cache(maxsize=1)
+def get_auth_settings() -> "AuthSettings":
+    """Get cached auth settings."""
+    from .auth import AuthSettings
+    return AuthSettings.load()
+
+
+@lru_cache(maxsize=1)
+def get_document_settings() -> "DocumentSettings":
+    """Get cached document settings."""
+    from .documents import DocumentSettings
+    return DocumentSettings.load()
+
+
+@lru_cache(maxsize=1)
+def get_embedding_settings() -> "EmbeddingSettings":
+    """Get cached embedding settings."""
+    from .embeddings import EmbeddingSettings
+    return EmbeddingSettings.load()
+
+
+@lru_cache(maxsize=1)
+def get_vector_settings() -> "VectorSettings":
+    """Get cached vector settings."""
+    from .vectors import VectorSettings
+    return VectorSettings.load()
+
+
+@lru_cache(maxsize=1)
+def get_llm_settings() -> "LLMSettings":
+    """Get cached LLM settings."""
+    from .llm import LLMSettings
+    return LLMSettings.load()
+
+
+@lru_cache(maxsize=1)
+def get_redis_settings() -> "RedisSettings":
+    """Get cached Redis settings."""
+    from .redis import RedisSettings
+    return RedisSettings.load()
+
+
+@lru_cache(maxsize=1)
+def get_logging_settings() -> "LoggingSettings":
+    """Get cached logging settings."""
+    from .logging import LoggingSettings
+    return LoggingSettings.load()
+
+
+_SECTION_FACTORIES = (
+    get_environment_settings,
+    get_auth_settings,
+    get_document_settings,
+    get_embedding_settings,
+    get_vector_settings,
+    get_llm_settings,
+    get_redis_settings,
+    get_logging_settings,
+)
+
+
+class LazySection:
+    """Resolve a settings section through its factory on first access and keep it on the instance."""
+
+    def __init__(self, factory: Callable[[], BaseAppSettings]):
+        self.factory = factory
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance: Any, owner: type = None) -> Any:
+        if instance is None:
+            return self
+        # Stored in the instance dict, so later reads bypass the descriptor
+        section = instance.__dict__[self.name] = self.factory()
+        return section
 
 
 class Settings(BaseModel):
     """Composed settings with all configuration sections."""
+
+    model_config = ConfigDict(ignored_types=(LazySection,))
     
-    environment: EnvironmentSettings = EnvironmentSettings()
-    auth: AuthSettings = AuthSettings()
-    documents: DocumentSettings = DocumentSettings()
-    embeddings: EmbeddingSettings = EmbeddingSettings()
-    vectors: VectorSettings = VectorSettings()
-    llm: LLMSettings = LLMSettings()
-    redis: RedisSettings = RedisSettings()
-    logging: LoggingSettings = LoggingSettings()
+    environment = LazySection(get_environment_settings)
+    auth = LazySection(get_auth_settings)
+    documents = LazySection(get_document_settings)
+    embeddings = LazySection(get_embedding_settings)
+    vectors = LazySection(get_vector_settings)
+    llm = LazySection(get_llm_settings)
+    redis = LazySection(get_redis_settings)
+    logging = LazySection(get_logging_settings)
+
+    def model_dump(self, **kwargs: Any) -> Dict[str, Any]:
+        """Dump every section, building any that has not been accessed yet."""
+        return {name: getattr(self, name).model_dump(**kwargs) for name in _SECTION_NAMES}
+
+    def model_dump_json(self, **kwargs: Any) -> str:
+        """Serialize every section with pydantic's JSON serializer, joining the fragments directly."""
+        indent = kwargs.pop("indent", None)
+        if indent is not None:
+            return json.dumps(self.model_dump(mode="json", **kwargs), indent=indent)
+        return "{" + ",".join(
+            f'"{name}":{getattr(self, name).model_dump_json(**kwargs)}' for name in _SECTION_NAMES
+        ) + "}"
+
+
+_SECTION_NAMES = tuple(name for name, value in vars(Settings).items() if isinstance(value, LazySection))
 
 
 @lru_cache()
@@ -31,13 +155,42 @@ def get_settings() -> Settings:
     return Settings()
 
 
-# Convenience instance
-settings = get_settings()
+def reload_settings() -> Settings:
+    """Drop cached settings and env file contents, then build fresh settings."""
+    get_env_files.cache_clear()
+    read_env_file.cache_clear()
+    for factory in _SECTION_FACTORIES:
+        factory.cache_clear()
+    get_settings.cache_clear()
+    return get_settings()
+
+
+def __getattr__(name: str) -> Any:
+    # Convenience instance, built on first access rather than at import
+    if name == "settings":
+        return get_settings()
+    if name in _LAZY_ATTRIBUTES:
+        value = globals()[name] = getattr(import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "Settings", 
     "settings",
+    "get_settings",
+    "reload_settings",
+    # Per-section factories
+    "get_environment_settings",
+    "get_auth_settings",
+    "get_document_settings",
+    "get_embedding_settings",
+    "get_vector_settings",
+    "get_llm_settings",
+    "get_redis_settings",
+    "get_logging_settings",
     # Individual settings classes
+    "Environment",
     "EnvironmentSettings",
     "AuthSettings",
     "DocumentSettings",
@@ -1,10 +1,14 @@
-from typing import List, Optional
+from functools import cached_property
+from types import MappingProxyType
+from typing import Annotated, Any, FrozenSet, List, Mapping, Optional
 
-from pydantic import Field, SecretStr
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic import Field, SecretStr, field_validator
+from pydantic_settings import NoDecode, SettingsConfigDict
 
+from .base import BaseAppSettings, parse_list_value
 
-class AuthSettings(BaseSettings):
+
+class AuthSettings(BaseAppSettings):
     """Authentication and authorization settings."""
     
     model_config = SettingsConfigDict(
@@ -17,7 +21,7 @@ class AuthSettings(BaseSettings):
     
     # API Key Authentication
     api_key_required: bool = Field(default=False, description="Require API key for requests")
-    api_keys: List[str] = Field(default_factory=list, description="Valid API keys")
+    api_keys: Annotated[List[str], NoDecode] = Field(default_factory=list, description="Valid API keys")
     api_key_header: str = Field(default="X-API-Key", description="API key header name")
     
     # JWT Configuration
@@ -28,6 +32,22 @@ class AuthSettings(BaseSettings):
 
     hash_secret_key: SecretStr = Field(description="For password hashing")
     
+    # Resolved-user cache for repeat bearer tokens
+    auth_cache_enabled: bool = Field(default=True, description="Cache users resolved from access tokens")
+    auth_cache_ttl_seconds: int = Field(default=60, ge=1, description="Seconds a resolved user stays cached")
+    auth_cache_max_entries: int = Field(default=10_000, ge=1, description="Maximum number of cached tokens")
+
+    # Recently verified logins skip the bcrypt check
+    password_cache_enabled: bool = Field(default=True, description="Cache successful password checks for repeat logins")
+    password_cache_ttl_seconds: int = Field(default=60, ge=1, description="Seconds a verified password stays cached")
+    password_cache_max_entries: int = Field(default=10_000, ge=1, description="Maximum number of cached password checks")
+
+    # Bloom filter answering "not blacklisted" without a lookup
+    blacklist_filter_enabled: bool = Field(default=True, description="Skip blacklist lookups for tokens a Bloom filter rules out")
+    blacklist_filter_capacity: int = Field(default=100_000, ge=1, description="Blacklisted tokens per token lifetime the filter is sized for")
+    blacklist_filter_error_rate: float = Field(default=1e-4, gt=0, lt=1, description="Target false-positive rate of the blacklist filter")
+    blacklist_filter_sync_seconds: float = Field(default=5.0, gt=0, description="Seconds between pulls of new blacklist entries into the filter")
+    
     # Session Configuration
     session_timeout_minutes: int = Field(default=30, description="Session timeout in minutes")
     max_concurrent_sessions: int = Field(default=5, description="Maximum concurrent sessions per user")
@@ -42,18 +62,27 @@ class AuthSettings(BaseSettings):
     require_email_verification: bool = Field(default=False, description="Require email verification")
     password_min_length: int = Field(default=8, description="Minimum password length")
     
-    @property
-    def jwt_config(self) -> dict:
-        """Get JWT configuration dictionary."""
-        return {
+    @field_validator('api_keys', mode='before')
+    @classmethod
+    def parse_api_keys(cls, v):
+        """Parse API keys from a comma-separated string or JSON list."""
+        return parse_list_value(v)
+    
+    @cached_property
+    def jwt_config(self) -> Mapping[str, Any]:
+        """Get JWT configuration, resolved once per settings instance."""
+        return MappingProxyType({
             "secret_key": self.jwt_secret_key.get_secret_value(),
             "algorithm": self.jwt_algorithm,
             "access_token_expire_hours": self.jwt_expiration_hours,
             "refresh_token_expire_days": self.jwt_refresh_expiration_days
-        }
+        })
+    
+    @cached_property
+    def _api_key_set(self) -> FrozenSet[str]:
+        """Valid API keys as a frozenset for constant-time lookup."""
+        return frozenset(self.api_keys)
     
     def is_valid_api_key(self, api_key: str) -> bool:
         """Check if provided API key is valid."""
-        if not self.api_key_required:
-            return True
-        return api_key in self.api_keys
\ No newline at end of file
+        return not self.api_key_required or api_key in self._api_key_set
\ No newline at end of file
@@ -0,0 +1,161 @@
+import json
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Hashable, Mapping, Optional, Set, Tuple, Type, TypeVar, Union
+
+from pydantic_settings import BaseSettings, DotEnvSettingsSource, SettingsConfigDict
+from pydantic_settings.sources import ENV_FILE_SENTINEL
+
+
+ENV_DIR = Path(".env")
+
+SettingsT = TypeVar("SettingsT", bound="BaseAppSettings")
+
+# Directories already ensured by this process
+_created_directories: Set[str] = set()
+
+# Last validated field values per settings class, with the inputs they came from
+_validated_values: Dict[type, Tuple[Hashable, Dict[str, Any]]] = {}
+
+# KEY=value lines with optional `export`, quoting, and trailing comments (which may follow a
+# closing quote directly, but need whitespace before them otherwise); a bare KEY has no value
+_ENV_LINE_RE = re.compile(
+    r"""^[ \t]*(?:export[ \t]+)?([A-Za-z_][A-Za-z0-9_.]*)(?:[ \t]*(=)[ \t]*"""
+    r"""(?:'([^']*)'(?:[ \t]*\#[^\r\n]*)?|"((?:[^"\\]|\\.)*)"(?:[ \t]*\#[^\r\n]*)?"""
+    r"""|(?<=[ \t])\#[^\r\n]*|([^\r\n]*?)(?:[ \t]+\#[^\r\n]*)?))?[ \t]*\r?$""",
+    re.MULTILINE,
+)
+_ENV_VAR_RE = re.compile(r"\$\{([A-Za-z_][A-Za-z0-9_]*)(?::-([^}]*))?\}")
+_ESCAPES_RE = re.compile(r"""\\([\\'"abfnrtv])""")
+_ESCAPES = {"a": "\a", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t", "v": "\v"}
+
+
+@lru_cache(maxsize=1)
+def get_env_files() -> FrozenSet[str]:
+    """Get the env files present in the env directory, found with a single scan."""
+    try:
+        with os.scandir(ENV_DIR) as entries:
+            return frozenset(
+                os.path.normpath(entry.path)
+                for entry in entries
+                if entry.name.endswith(".env") and entry.is_file()
+            )
+    except FileNotFoundError:
+        return frozenset()
+
+
+def parse_env(data: str) -> Dict[str, Optional[str]]:
+    """Parse dotenv content in one regex pass, expanding ${VAR} like python-dotenv."""
+    values: Dict[str, Optional[str]] = {}
+
+    def expand(match: re.Match) -> str:
+        name, default = match.group(1), match.group(2)
+        # Earlier keys in the file win over the environment, even a bare KEY with no value
+        value = values[name] if name in values else os.environ.get(name, default)
+        return value or ""
+
+    for match in _ENV_LINE_RE.finditer(data):
+        key, equals, single_quoted, double_quoted, bare = match.groups()
+        if equals is None:
+            values[key] = None
+            continue
+        if double_quoted is not None:
+            value = _ESCAPES_RE.sub(lambda m: _ESCAPES.get(m.group(1), m.group(1)), double_quoted)
+        else:
+            value = single_quoted if single_quoted is not None else (bare or "")
+        values[key] = _ENV_VAR_RE.sub(expand, value)
+    return values
+
+
+@lru_cache(maxsize=None)
+def read_env_file(path: str, encoding: str = "utf-8") -> Mapping[str, Optional[str]]:
+    """Parse an env file once; sections sharing a file reuse the result."""
+    return MappingProxyType(parse_env(Path(path).read_text(encoding=encoding)))
+
+
+def parse_list_value(value: Any) -> Any:
+    """Parse a list setting given as a comma-separated string (or a JSON list)."""
+    if not isinstance(value, str):
+        return value
+    value = value.strip()
+    if value.startswith("["):
+        return json.loads(value)
+    # Strip each item once, dropping blanks left by stray commas
+    return [item for item in map(str.strip, value.split(",")) if item]
+
+
+def ensure_directories(*paths: Union[str, os.PathLike]) -> None:
+    """Create each directory (and its parents) once per process; existing ones are left alone."""
+    for path in map(os.fspath, paths):
+        if path not in _created_directories:
+            # A stat is cheaper than makedirs' failed mkdir on directories that already exist
+            if not os.path.isdir(path):
+                os.makedirs(path, exist_ok=True)
+            _created_directories.add(path)
+
+
+class EnvFilesSettingsSource(DotEnvSettingsSource):
+    """Dotenv source that only opens env files known to exist."""
+
+    def _load_env_vars(self) -> Mapping[str, Optional[str]]:
+        env_files = self.env_file
+        if isinstance(env_files, (str, os.PathLike)):
+            env_files = [env_files]
+
+        present = get_env_files()
+        env_vars: Dict[str, Optional[str]] = {}
+        for env_file in env_files or ():
+            path = os.path.normpath(env_file)
+            if path in present:
+                env_vars.update(read_env_file(path, self.env_file_encoding or "utf-8"))
+
+        if not self.case_sensitive:
+            return {key.lower(): value for key, value in env_vars.items()}
+        return env_vars
+
+
+class BaseAppSettings(BaseSettings):
+    """Base class for the settings sections, reading env files through the shared source."""
+
+    # Settings are read-only once loaded; sections merge their own config over this
+    model_config = SettingsConfigDict(frozen=True)
+
+    def __init__(self, _env_file: Any = ENV_FILE_SENTINEL, **values: Any) -> None:
+        # An empty env file list keeps pydantic-settings from reading the file itself;
+        # the shared source picks up the configured file instead.
+        super().__init__(_env_file=() if _env_file == ENV_FILE_SENTINEL else _env_file, **values)
+
+    @classmethod
+    def load(cls: Type[SettingsT]) -> SettingsT:
+        """Build settings, skipping validation when the env file and environment are unchanged."""
+        env_file = cls.model_config.get("env_file")
+        env_files = (env_file,) if isinstance(env_file, (str, os.PathLike)) else tuple(env_file or ())
+        present = get_env_files()
+        signature = (
+            tuple(os.stat(path).st_mtime_ns for path in map(os.path.normpath, env_files) if path in present),
+            frozenset(os.environ.items()),
+        )
+
+        cached = _validated_values.get(cls)
+        if cached is not None and cached[0] == signature:
+            return cls.model_construct(**cached[1])
+
+        settings = cls()
+        _validated_values[cls] = (signature, dict(settings))
+        return settings
+
+    @classmethod
+    def settings_customise_sources(
+        cls,
+        settings_cls,
+        init_settings,
+        env_settings,
+        dotenv_settings,
+        file_secret_settings,
+    ):
+        if dotenv_settings.env_file == ():
+            dotenv_settings = EnvFilesSettingsSource(settings_cls)
+        return init_settings, env_settings, dotenv_settings, file_secret_settings
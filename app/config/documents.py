@@ -1,11 +1,14 @@
+from functools import cached_property
 from pathlib import Path
 from typing import List
 
-from pydantic import Field
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic import Field, model_validator
+from pydantic_settings import SettingsConfigDict
 
+from .base import BaseAppSettings, ensure_directories
 
-class DocumentSettings(BaseSettings):
+
+class DocumentSettings(BaseAppSettings):
     """Document processing and file upload settings."""
     
     model_config = SettingsConfigDict(
@@ -37,17 +40,18 @@ class DocumentSettings(BaseSettings):
     remove_urls: bool = Field(default=False, description="Remove URLs from text")
     remove_emails: bool = Field(default=False, description="Remove email addresses from text")
     
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        # Ensure upload directory exists
-        Path(self.upload_dir).mkdir(parents=True, exist_ok=True)
+    @model_validator(mode='after')
+    def ensure_upload_dir(self):
+        """Ensure upload directory exists."""
+        ensure_directories(self.upload_dir)
+        return self
     
-    @property
+    @cached_property
     def allowed_extensions_set(self) -> set:
         """Get allowed file extensions as a set for faster lookup."""
         return set(ext.lower() for ext in self.allowed_file_types)
     
-    @property
+    @cached_property
     def max_file_size_bytes(self) -> int:
         """Get maximum file size in bytes."""
         return self.max_file_size_mb * 1024 * 1024
\ No newline at end of file
@@ -1,10 +1,36 @@
-from typing import Dict, Any, Optional
+import sys
+from functools import cached_property
+from types import MappingProxyType
+from typing import Any, Mapping
 
-from pydantic import Field
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic import Field, field_validator
+from pydantic_settings import SettingsConfigDict
 
+from .base import BaseAppSettings
 
-class EmbeddingSettings(BaseSettings):
+
+_MODEL_CONFIGS: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+    sys.intern("text-embedding-3-small"): MappingProxyType({
+        "dimensions": 1536,
+        "max_tokens": 8191,
+        "cost_per_1k": 0.00002
+    }),
+    sys.intern("text-embedding-3-large"): MappingProxyType({
+        "dimensions": 3072,
+        "max_tokens": 8191,
+        "cost_per_1k": 0.00013
+    }),
+    sys.intern("text-embedding-ada-002"): MappingProxyType({
+        "dimensions": 1536,
+        "max_tokens": 8191,
+        "cost_per_1k": 0.0001
+    }),
+})
+
+_EMPTY_MODEL_INFO: Mapping[str, Any] = MappingProxyType({})
+
+
+class EmbeddingSettings(BaseAppSettings):
     """Embedding model configuration settings."""
     
     model_config = SettingsConfigDict(
@@ -24,34 +50,25 @@ class EmbeddingSettings(BaseSettings):
     embedding_batch_size: int = Field(default=100, description="Batch size for embedding requests")
     embedding_max_retries: int = Field(default=3, description="Maximum retry attempts")
     embedding_timeout: int = Field(default=30, description="Request timeout in seconds")
+    embedding_cache_enabled: bool = Field(default=True, description="Reuse stored embeddings for chunk text that was embedded before")
+    embedding_cache_max_entries: int = Field(default=50_000, ge=1, description="Stored embeddings kept before the oldest are dropped (about 6 KB each at 1536 dimensions)")
+    
+    @field_validator("embedding_model", "embedding_model_fallback")
+    @classmethod
+    def intern_model_name(cls, v: str) -> str:
+        """Intern model names so model config lookups hit the identity fast path."""
+        return sys.intern(v)
     
     @property
-    def model_configs(self) -> Dict[str, Dict[str, Any]]:
+    def model_configs(self) -> Mapping[str, Mapping[str, Any]]:
         """Available embedding model configurations."""
-        return {
-            "text-embedding-3-small": {
-                "dimensions": 1536,
-                "max_tokens": 8191,
-                "cost_per_1k": 0.00002
-            },
-            "text-embedding-3-large": {
-                "dimensions": 3072,
-                "max_tokens": 8191,
-                "cost_per_1k": 0.00013
-            },
-            "text-embedding-ada-002": {
-                "dimensions": 1536,
-                "max_tokens": 8191,
-                "cost_per_1k": 0.0001
-            }
-        }
+        return _MODEL_CONFIGS
     
-    def get_model_info(self, model_name: str | None = None) -> Dict[str, Any]:
+    def get_model_info(self, model_name: str | None = None) -> Mapping[str, Any]:
         """Get configuration info for specified model or current model."""
-        model = model_name or self.embedding_model
-        return self.model_configs.get(model, {})
+        return _MODEL_CONFIGS.get(model_name or self.embedding_model, _EMPTY_MODEL_INFO)
     
-    @property
+    @cached_property
     def current_model_dimensions(self) -> int:
         """Get dimensions for the current embedding model."""
         model_info = self.get_model_info()
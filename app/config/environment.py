@@ -1,10 +1,20 @@
-from typing import List, Literal, Union
+from enum import Enum
+from functools import cached_property
+from typing import Annotated, List, Union
 
 from pydantic import Field, field_validator, model_validator
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic_settings import NoDecode, SettingsConfigDict
 
+from .base import BaseAppSettings, parse_list_value
 
-class EnvironmentSettings(BaseSettings):
+
+class Environment(str, Enum):
+    DEVELOPMENT = "development"
+    STAGING = "staging"
+    PRODUCTION = "production"
+
+
+class EnvironmentSettings(BaseAppSettings):
     """Environment and application settings."""
     
     model_config = SettingsConfigDict(
@@ -16,7 +26,7 @@ class EnvironmentSettings(BaseSettings):
     )
     
     # Environment
-    environment: Literal["development", "staging", "production"] = Field(default="development", description="Application environment")
+    environment: Environment = Field(default=Environment.DEVELOPMENT, description="Application environment")
     debug: bool = Field(default=True, description="Enable debug mode")
     
     # API Server
@@ -26,10 +36,14 @@ class EnvironmentSettings(BaseSettings):
     # Database
     db_url: str = Field(default="", description="Main db url")
     migrations_url: str = Field(default="", description="Url for db migrations")
+    db_pool_size: int = Field(default=5, ge=1, description="Connections kept open in the db pool")
+    db_max_overflow: int = Field(default=10, ge=0, description="Extra connections allowed beyond the pool size")
+    db_pool_recycle_seconds: int = Field(default=1800, ge=-1, description="Reconnect pooled connections older than this (-1 disables)")
+    db_pool_pre_ping: bool = Field(default=False, description="Test each pooled connection with a round trip before handing it out")
     
     # Security
     api_key_required: bool = Field(default=False, description="Require API key for requests")
-    allowed_origins: List[str] = Field(default_factory=lambda: ["*"], description="CORS allowed origins")
+    allowed_origins: Annotated[List[str], NoDecode] = Field(default_factory=lambda: ["*"], description="CORS allowed origins")
     cors_enabled: bool = Field(default=True, description="Enable CORS")
     max_request_size_mb: int = Field(default=100, description="Maximum request size in MB")
     
@@ -57,29 +71,20 @@ class EnvironmentSettings(BaseSettings):
     @field_validator('allowed_origins', mode='before')
     @classmethod
     def parse_allowed_origins(cls, v):
-        """Parse allowed origins from various formats."""
-        if isinstance(v, str):
-            # Handle single asterisk
-            if v.strip() == '*':
-                return ['*']
-            # Handle comma-separated values
-            if ',' in v:
-                return [origin.strip() for origin in v.split(',')]
-            # Handle single value
-            return [v.strip()]
-        return v
+        """Parse allowed origins from a comma-separated string or JSON list."""
+        return parse_list_value(v)
     
-    @property
+    @cached_property
     def is_development(self) -> bool:
         """Check if running in development environment."""
-        return self.environment == "development"
+        return self.environment is Environment.DEVELOPMENT
     
-    @property
+    @cached_property
     def is_production(self) -> bool:
         """Check if running in production environment."""
-        return self.environment == "production"
+        return self.environment is Environment.PRODUCTION
     
-    @property
+    @cached_property
     def server_config(self) -> dict:
         """Get server configuration for uvicorn."""
         return {
@@ -1,10 +1,13 @@
+from functools import cached_property
 from typing import Dict, Optional, Any
 
 from pydantic import Field, SecretStr
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic_settings import SettingsConfigDict
 
+from .base import BaseAppSettings
 
-class LLMSettings(BaseSettings):
+
+class LLMSettings(BaseAppSettings):
     """Large Language Model configuration settings."""
     
     model_config = SettingsConfigDict(
@@ -46,7 +49,7 @@ class LLMSettings(BaseSettings):
     include_chat_history: bool = Field(default=True, description="Include previous messages in context")
     conversation_timeout_minutes: int = Field(default=30, description="Conversation timeout in minutes")
     
-    @property
+    @cached_property
     def model_presets(self) -> Dict[str, str]:
         """Predefined model configurations."""
         return {
@@ -56,8 +59,9 @@ class LLMSettings(BaseSettings):
             "legacy": "gpt-3.5-turbo-instruct"
         }
     
-    def get_chat_params(self) -> Dict[str, Any]:
-        """Get chat completion parameters as a dictionary."""
+    @cached_property
+    def chat_params(self) -> Dict[str, Any]:
+        """Chat completion parameters, built once per settings instance."""
         return {
             "model": self.chat_model,
             "temperature": self.chat_temperature,
@@ -65,4 +69,8 @@ class LLMSettings(BaseSettings):
             "top_p": self.chat_top_p,
             "frequency_penalty": self.chat_frequency_penalty,
             "presence_penalty": self.chat_presence_penalty
-        }
\ No newline at end of file
+        }
+    
+    def get_chat_params(self) -> Dict[str, Any]:
+        """Get chat completion parameters as a dictionary."""
+        return self.chat_params
@@ -1,14 +1,34 @@
+from functools import cached_property
 from pathlib import Path
-from typing import Literal, Optional
+from types import MappingProxyType
+from typing import Mapping, Optional
 import logging
 import sys
 
-from pydantic import Field
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic import Field, field_validator, model_validator
+from pydantic_settings import SettingsConfigDict
 from loguru import logger
 
+from .base import BaseAppSettings, ensure_directories
 
-class LoggingSettings(BaseSettings):
+
+_TEMPLATES: Mapping[str, str] = MappingProxyType({
+    "text": "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
+    "detailed": "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> | <magenta>{extra[request_id]}</magenta> - <level>{message}</level>",
+    "json": "{time:YYYY-MM-DD HH:mm:ss.SSS} | {level} | {name}:{function}:{line} | {message} | {extra}"
+})
+_LOG_LEVELS = frozenset({"TRACE", "DEBUG", "INFO", "SUCCESS", "WARNING", "ERROR", "CRITICAL"})
+_LOG_FORMATS = frozenset(_TEMPLATES)
+_JSON_FORMAT = '{"time": "{time:YYYY-MM-DD HH:mm:ss.SSS}", "level": "{level}", "module": "{name}", "function": "{function}", "line": {line}, "message": "{message}", "extra": {extra}}'
+_QUERY_FORMAT = '{"time": "{time:YYYY-MM-DD HH:mm:ss.SSS}", "query": "{extra[query]}", "user": "{extra[user]}", "response_time": "{extra[response_time]}", "results": "{extra[results]}"}'
+
+
+def _has_query(record: dict) -> bool:
+    """Loguru filter passing only records that carry a query."""
+    return "query" in record["extra"]
+
+
+class LoggingSettings(BaseAppSettings):
     """Loguru logging configuration settings."""
     
     model_config = SettingsConfigDict(
@@ -20,8 +40,8 @@ class LoggingSettings(BaseSettings):
     )
     
     # Basic Logging
-    level: Literal["TRACE", "DEBUG", "INFO", "SUCCESS", "WARNING", "ERROR", "CRITICAL"] = Field(default="INFO", description="Log level")
-    format: Literal["json", "text", "detailed"] = Field(default="json", description="Log format")
+    level: str = Field(default="INFO", description="Log level")
+    format: str = Field(default="json", description="Log format")
     
     # Console Logging
     console_enabled: bool = Field(default=True, description="Enable console logging")
@@ -60,40 +80,51 @@ class LoggingSettings(BaseSettings):
     include_user_context: bool = Field(default=True, description="Include user context")
     serialize_json: bool = Field(default=True, description="Serialize JSON fields in logs")
     
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        # Ensure log directories exist
-        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+    @field_validator('level')
+    @classmethod
+    def validate_level(cls, v: str) -> str:
+        """Validate the log level against the known Loguru levels."""
+        if v not in _LOG_LEVELS:
+            raise ValueError(f"Log level must be one of: {', '.join(sorted(_LOG_LEVELS))}")
+        return v
+    
+    @field_validator('format')
+    @classmethod
+    def validate_format(cls, v: str) -> str:
+        """Validate the log format against the available templates."""
+        if v not in _LOG_FORMATS:
+            raise ValueError(f"Log format must be one of: {', '.join(sorted(_LOG_FORMATS))}")
+        return v
+    
+    @model_validator(mode='after')
+    def ensure_log_dirs(self):
+        """Ensure log directories exist, creating each distinct parent once."""
+        log_dirs = {self.file_path.parent}
         if self.error_file_enabled:
-            self.error_file_path.parent.mkdir(parents=True, exist_ok=True)
+            log_dirs.add(self.error_file_path.parent)
         if self.query_log_file:
-            self.query_log_file.parent.mkdir(parents=True, exist_ok=True)
+            log_dirs.add(self.query_log_file.parent)
+        ensure_directories(*log_dirs)
+        return self
     
     @property
-    def loguru_format_templates(self) -> dict:
+    def loguru_format_templates(self) -> Mapping[str, str]:
         """Get Loguru format templates."""
-        return {
-            "text": "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
-            "detailed": "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> | <magenta>{extra[request_id]}</magenta> - <level>{message}</level>",
-            "json": "{time:YYYY-MM-DD HH:mm:ss.SSS} | {level} | {name}:{function}:{line} | {message} | {extra}"
-        }
+        return _TEMPLATES
     
-    @property
+    @cached_property
     def console_format(self) -> str:
         """Get console log format."""
-        if self.format == "json":
-            return '{"time": "{time:YYYY-MM-DD HH:mm:ss.SSS}", "level": "{level}", "module": "{name}", "function": "{function}", "line": {line}, "message": "{message}", "extra": {extra}}'
-        return self.loguru_format_templates[self.format]
+        return _JSON_FORMAT if self.format == "json" else _TEMPLATES[self.format]
     
-    @property
+    @cached_property
     def file_format(self) -> str:
         """Get file log format."""
-        if self.format == "json":
-            return '{"time": "{time:YYYY-MM-DD HH:mm:ss.SSS}", "level": "{level}", "module": "{name}", "function": "{function}", "line": {line}, "message": "{message}", "extra": {extra}}'
-        return self.loguru_format_templates.get(self.format, self.loguru_format_templates["text"])
+        return _JSON_FORMAT if self.format == "json" else _TEMPLATES.get(self.format, _TEMPLATES["text"])
     
-    def get_loguru_config(self) -> list:
-        """Get Loguru configuration as a list of handlers."""
+    @cached_property
+    def loguru_config(self) -> list:
+        """Loguru handler configuration, built once per settings instance."""
         handlers = []
         
         # Console handler
@@ -134,16 +165,29 @@ class LoggingSettings(BaseSettings):
         if self.enable_query_logging and self.query_log_file:
             handlers.append({
                 "sink": str(self.query_log_file),
-                "format": '{"time": "{time:YYYY-MM-DD HH:mm:ss.SSS}", "query": "{extra[query]}", "user": "{extra[user]}", "response_time": "{extra[response_time]}", "results": "{extra[results]}"}',
+                "format": _QUERY_FORMAT,
                 "level": "INFO",
                 "rotation": self.rotation_size,
                 "retention": self.retention_time,
                 "compression": self.compression,
                 "serialize": True,
-                "filter": lambda record: "query" in record["extra"]
+                "filter": _has_query
             })
         
         return handlers
+    
+    def get_loguru_config(self) -> list:
+        """Get Loguru configuration as a list of handlers."""
+        return self.loguru_config
+
+
+_INTERCEPTED_LOGGERS = (
+    "uvicorn",
+    "uvicorn.error",
+    "uvicorn.access",
+    "fastapi",
+    "sqlalchemy",
+)
 
 
 class InterceptHandler(logging.Handler):
@@ -173,13 +217,7 @@ def setup_logging(settings: Optional[LoggingSettings] = None) -> None:
 
     # Intercept std logging
     logging.basicConfig(handlers=[InterceptHandler()], level=0, force=True)
-    for name in (
-        "uvicorn",
-        "uvicorn.error",
-        "uvicorn.access",
-        "fastapi",
-        "sqlalchemy",
-    ):
+    for name in _INTERCEPTED_LOGGERS:
         logging.getLogger(name).handlers = [InterceptHandler()]
         logging.getLogger(name).propagate = False
 
@@ -1,10 +1,13 @@
+from functools import cached_property
 from typing import List, Optional
 
-from pydantic import Field, SecretStr
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic import Field, PrivateAttr, SecretStr
+from pydantic_settings import SettingsConfigDict
 
+from .base import BaseAppSettings
 
-class RedisSettings(BaseSettings):
+
+class RedisSettings(BaseAppSettings):
     """Redis configuration settings."""
     
     model_config = SettingsConfigDict(
@@ -16,6 +19,7 @@ class RedisSettings(BaseSettings):
     )
     
     # Basic Connection
+    enabled: bool = Field(default=False, description="Cache blacklisted tokens in Redis; only consulted behind the blacklist filter")
     host: str = Field(default="localhost", description="Redis host")
     port: int = Field(default=6379, ge=1, le=65535, description="Redis port")
     password: Optional[SecretStr] = Field(default=None, description="Redis password")
@@ -44,20 +48,28 @@ class RedisSettings(BaseSettings):
     sentinel_service_name: str = Field(default="mymaster", description="Sentinel service name")
     sentinel_password: Optional[SecretStr] = Field(default=None, description="Sentinel password")
     
-    @property
+    # Plain-text password, unwrapped once after init
+    _password_plain: Optional[str] = PrivateAttr(default=None)
+    
+    def model_post_init(self, __context) -> None:
+        """Post-initialization setup."""
+        if self.password:
+            self._password_plain = self.password.get_secret_value()
+    
+    @cached_property
     def connection_url(self) -> str:
         """Generate Redis connection URL."""
         scheme = "rediss" if self.ssl else "redis"
         auth = ""
         
         if self.username and self.password:
-            auth = f"{self.username}:{self.password.get_secret_value()}@"
+            auth = f"{self.username}:{self._password_plain}@"
         elif self.password:
-            auth = f":{self.password.get_secret_value()}@"
+            auth = f":{self._password_plain}@"
         
         return f"{scheme}://{auth}{self.host}:{self.port}/{self.db}"
     
-    @property
+    @cached_property
     def connection_kwargs(self) -> dict:
         """Get connection parameters as kwargs."""
         kwargs = {
@@ -72,7 +84,7 @@ class RedisSettings(BaseSettings):
         }
         
         if self.password:
-            kwargs["password"] = self.password.get_secret_value()
+            kwargs["password"] = self._password_plain
         if self.username:
             kwargs["username"] = self.username
         if self.ssl:
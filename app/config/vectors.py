@@ -1,11 +1,17 @@
+from functools import cached_property
 from pathlib import Path
-from typing import Literal
 
 from pydantic import Field, field_validator, model_validator
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic_settings import SettingsConfigDict
 
+from .base import BaseAppSettings, ensure_directories
 
-class VectorSettings(BaseSettings):
+
+_VECTOR_DB_TYPES = frozenset({"chroma"})
+_DISTANCE_METRICS = frozenset({"cosine", "l2", "ip"})
+
+
+class VectorSettings(BaseAppSettings):
     """Vector database configuration settings."""
     
     model_config = SettingsConfigDict(
@@ -16,16 +22,25 @@ class VectorSettings(BaseSettings):
     )
     
     # Database Configuration
-    vector_db_type: Literal["chroma"] = Field(default="chroma", description="Vector database type")
+    vector_db_type: str = Field(default="chroma", description="Vector database type")
     chroma_persist_dir: Path = Field(default=Path("./storage/chroma_db"), description="Chroma persistence directory")
     chroma_collection_name: str = Field(default="documents", description="Chroma collection name")
-    chroma_distance_metric: Literal["cosine", "l2", "ip"] = Field(default="cosine", description="Distance metric for similarity")
+    chroma_distance_metric: str = Field(default="cosine", description="Distance metric for similarity")
     
     # Search Configuration
     default_search_results: int = Field(default=5, description="Default number of search results")
     max_search_results: int = Field(default=20, description="Maximum number of search results")
     min_similarity_threshold: float = Field(default=0.5, ge=0.0, le=1.0, description="Minimum similarity threshold")
     rerank_results: bool = Field(default=True, description="Enable result reranking")
+    search_cache_enabled: bool = Field(default=True, description="Cache search responses for repeated queries")
+    search_cache_ttl_seconds: int = Field(default=300, ge=1, description="Seconds a cached search response stays valid")
+    search_cache_max_entries: int = Field(default=1024, ge=1, description="Maximum number of cached search responses")
+    semantic_cache_enabled: bool = Field(default=True, description="Serve near-identical queries from cached search responses")
+    semantic_cache_threshold: float = Field(default=0.95, gt=0, le=1, description="Minimum query-embedding cosine similarity for a semantic cache hit")
+    semantic_cache_ttl_seconds: int = Field(default=300, ge=1, description="Seconds a semantically cached response stays valid")
+    semantic_cache_max_entries: int = Field(default=1024, ge=1, description="Maximum number of semantically cached responses")
+    search_batch_max_size: int = Field(default=16, ge=1, description="Maximum concurrent searches embedded in one call")
+    search_batch_window_ms: int = Field(default=20, ge=0, description="How long a search waits for others to batch with, in ms")
     
     # Context Building
     max_context_length: int = Field(default=4000, description="Maximum context length in characters")
@@ -39,6 +54,22 @@ class VectorSettings(BaseSettings):
     semantic_search_weight: float = Field(default=0.7, ge=0.0, le=1.0, description="Weight for semantic search")
     keyword_search_weight: float = Field(default=0.3, ge=0.0, le=1.0, description="Weight for keyword search")
     
+    @field_validator('vector_db_type')
+    @classmethod
+    def validate_vector_db_type(cls, v: str) -> str:
+        """Validate the vector database type."""
+        if v not in _VECTOR_DB_TYPES:
+            raise ValueError(f"Vector database type must be one of: {', '.join(sorted(_VECTOR_DB_TYPES))}")
+        return v
+    
+    @field_validator('chroma_distance_metric')
+    @classmethod
+    def validate_distance_metric(cls, v: str) -> str:
+        """Validate the Chroma distance metric."""
+        if v not in _DISTANCE_METRICS:
+            raise ValueError(f"Distance metric must be one of: {', '.join(sorted(_DISTANCE_METRICS))}")
+        return v
+    
     @model_validator(mode='after')
     def validate_search_weights(self):
         """Validate that search weights are reasonable."""
@@ -49,9 +80,9 @@ class VectorSettings(BaseSettings):
     def model_post_init(self, __context) -> None:
         """Post-initialization setup."""
         # Ensure chroma directory exists
-        self.chroma_persist_dir.mkdir(parents=True, exist_ok=True)
+        ensure_directories(self.chroma_persist_dir)
     
-    @property
+    @cached_property
     def chroma_settings(self) -> dict:
         """Get Chroma-specific configuration."""
         return {
@@ -62,7 +93,7 @@ class VectorSettings(BaseSettings):
             }
         }
     
-    @property
+    @cached_property
     def search_config(self) -> dict:
         """Get search configuration summary."""
         return {
@@ -1,51 +1,108 @@
-from fastapi import Depends, APIRouter, Query
+from fastapi import BackgroundTasks, Depends, APIRouter, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse, Response
 
 from app.dependencies.auth import get_current_user
 from app.schemas.auth import UserResponse
 from app.services.document import DocumentService
-from app.dependencies.documents import preprocess_uploaded_file, get_document_service, assemble_search_request
-from langchain_core.documents import Document
-from app.schemas.document import AddDocumentsResult, SearchResponse, SearchRequest, DocumentOperationResult
-from typing import List, Union
+from app.config import Settings
+from app.dependencies.config import get_settings
+from app.dependencies.documents import preprocess_uploaded_file, validate_file, get_document_service, get_search_cache, get_ingestion_jobs, assemble_search_request
+from app.schemas.document import AddDocumentsResult, IngestionJob, SearchResponse, SearchRequest, DocumentOperationResult
+from app.schemas.upload import UploadResult
+from typing import Optional, Union
+from app.utils.caching import SearchCache
+from app.utils.jobs import IngestionJobStore
 from app.config.logging import logger
 
 
 document_controller = APIRouter(
     prefix="/documents",
-    tags=["documents", "retrieval"]
+    tags=["documents", "retrieval"],
+    default_response_class=ORJSONResponse
 )
 
 
-@document_controller.post('/', response_model=AddDocumentsResult)
+async def _ingest_upload(
+    job_id: str,
+    upload: UploadResult,
+    settings: Settings,
+    service: DocumentService,
+    cache: Optional[SearchCache],
+    jobs: IngestionJobStore
+) -> None:
+    jobs.update(job_id, status="running")
+    logger.debug("Background ingestion started", extra={"job_id": job_id, "source_file": upload.source_file})
+    try:
+        chunks = await preprocess_uploaded_file(settings, upload)
+        result = await service.add_documents(chunks)
+    except Exception as e:
+        logger.exception("Background ingestion failed", extra={"job_id": job_id})
+        jobs.update(job_id, status="failed", result=AddDocumentsResult.model_construct(
+            success=False,
+            message=f"Failed to ingest document: {str(e)}",
+            added_count=0,
+            uuids=[]
+        ))
+        return
+    if result.success and cache is not None:
+        # New chunks can change the answer to any cached query
+        cache.clear()
+    jobs.update(job_id, status="completed" if result.success else "failed", result=result)
+    logger.info("Background ingestion finished", extra={"job_id": job_id, "success": result.success, "added_count": result.added_count})
+
+
+# Splitting, embedding and storing run after the response is sent; clients poll the job.
+# Results come pre-built, so response_model=None skips FastAPI's re-validation and
+# `responses` keeps the schemas in the OpenAPI docs.
+@document_controller.post('/', status_code=status.HTTP_202_ACCEPTED, response_model=None, responses={202: {"model": IngestionJob}})
 async def add_document(
+    background_tasks: BackgroundTasks,
+    settings: Settings = Depends(get_settings),
     service: DocumentService = Depends(get_document_service),
-    chunks: List[Document] = Depends(preprocess_uploaded_file)
-) -> AddDocumentsResult:
-    logger.debug("API add_document called", extra={"chunks": len(chunks) if chunks else 0})
-    result = await service.add_documents(chunks)
-    logger.info("API add_document completed", extra={"success": result.success, "added_count": getattr(result, 'added_count', None)})
-    return result
+    cache: Optional[SearchCache] = Depends(get_search_cache),
+    jobs: IngestionJobStore = Depends(get_ingestion_jobs),
+    upload: UploadResult = Depends(validate_file)
+) -> IngestionJob:
+    job = jobs.create(upload.owner_id, upload.source_file)
+    background_tasks.add_task(_ingest_upload, job.job_id, upload, settings, service, cache, jobs)
+    logger.opt(lazy=True).info("API add_document queued", extra=lambda: {"job_id": job.job_id, "source_file": upload.source_file})
+    return job
+
+@document_controller.get('/jobs/{job_id}', response_model=None, responses={200: {"model": IngestionJob}})
+async def get_ingestion_job(
+    job_id: str,
+    current_user: UserResponse = Depends(get_current_user),
+    jobs: IngestionJobStore = Depends(get_ingestion_jobs)
+) -> IngestionJob:
+    job = jobs.get(job_id)
+    if job is None or job.owner_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ingestion job not found")
+    return job
 
-@document_controller.delete('/', response_model=DocumentOperationResult)
+@document_controller.delete('/', response_model=None, responses={200: {"model": DocumentOperationResult}})
 async def deleted_document_by_source(
     source_file: str = Query(),
     current_user: UserResponse = Depends(get_current_user),
     service: DocumentService = Depends(get_document_service),
+    cache: Optional[SearchCache] = Depends(get_search_cache),
 ) -> DocumentOperationResult:
-    logger.debug("API delete by source called", extra={"source_file": source_file})
+    logger.opt(lazy=True).debug("API delete by source called", extra=lambda: {"source_file": source_file})
     result = await service.delete_by_source(source_file, current_user.id)
-    logger.info("API delete by source completed", extra={"success": result.success, "deleted_count": getattr(result, 'deleted_count', None)})
+    if result.success and cache is not None:
+        cache.clear()
+    logger.opt(lazy=True).info("API delete by source completed", extra=lambda: {"success": result.success, "deleted_count": getattr(result, 'deleted_count', None)})
     return result
 
-@document_controller.get('/similarity-search', response_model=Union[SearchResponse, DocumentOperationResult])
+@document_controller.get('/similarity-search', response_model=None, responses={200: {"model": Union[SearchResponse, DocumentOperationResult]}})
 async def similarity_search(
     request: SearchRequest = Depends(assemble_search_request),
     service: DocumentService = Depends(get_document_service)
-) -> Union[SearchResponse, DocumentOperationResult]:
-    logger.debug("API similarity search called", extra={"k": request.k, "include_scores": request.include_scores})
+) -> Response:
+    logger.opt(lazy=True).debug("API similarity search called", extra=lambda: {"k": request.k, "include_scores": request.include_scores})
     result = await service.similarity_search(request)
     if isinstance(result, SearchResponse):
-        logger.info("API similarity search completed", extra={"total_found": result.total_found})
+        logger.opt(lazy=True).info("API similarity search completed", extra=lambda: {"total_found": result.total_found})
     else:
         logger.warning("API similarity search failed", extra={"success": result.success, "message": result.message})
-    return result
\ No newline at end of file
+    # pydantic-core writes the JSON in one pass; returning the model would walk every result through jsonable_encoder first
+    return Response(content=result.model_dump_json(warnings=False), media_type="application/json")
\ No newline at end of file
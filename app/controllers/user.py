@@ -1,9 +1,10 @@
-from app.dependencies.auth import get_current_user
+from app.dependencies.auth import get_auth_cache, get_current_user
 from app.dependencies.services import get_user_service
 from app.schemas.auth import UserResponse, UserCreate, UserCredentials, Token, RefreshRequest
 from app.services.user import UserService
+from app.utils.caching import AuthCache
 from fastapi.security import OAuth2PasswordBearer
-from typing import Dict
+from typing import Dict, Optional
 from fastapi import APIRouter, Depends
 
 user_controller = APIRouter(
@@ -44,9 +45,13 @@ async def refresh(
 async def logout(
     current_user: UserResponse = Depends(get_current_user),
     token: str = Depends(oauth2_scheme),
-    service: UserService = Depends(get_user_service)
+    service: UserService = Depends(get_user_service),
+    cache: Optional[AuthCache] = Depends(get_auth_cache)
 ) -> Dict[str, str]:
     await service.logout_user(token, current_user.id)
+    if cache is not None:
+        # The token is blacklisted now; stop serving it from the cache
+        cache.discard(token)
     return {
         "message": "Logged out successfully"
     }
@@ -1,30 +1,58 @@
+from app.dependencies.config import get_settings
 from app.dependencies.services import get_user_service
 from app.schemas.auth import UserResponse
 from app.services.user import UserService
 from app.utils.auth import decode_jwt
+from app.utils.caching import AuthCache
 from fastapi.security import OAuth2PasswordBearer
 from fastapi import Depends, HTTPException, status
+from functools import lru_cache
+from typing import Optional
 import jwt
 from app.config.logging import logger
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+@lru_cache(maxsize=1)
+def get_auth_cache() -> Optional[AuthCache]:
+    # Shared by every request; None when caching is turned off
+    settings = get_settings()
+    if not settings.auth.auth_cache_enabled:
+        return None
+    return AuthCache(
+        max_entries=settings.auth.auth_cache_max_entries,
+        ttl_seconds=settings.auth.auth_cache_ttl_seconds
+    )
+
 async def get_current_user(
     service: UserService = Depends(get_user_service),
+    cache: Optional[AuthCache] = Depends(get_auth_cache),
     token: str = Depends(oauth2_scheme)
 ) -> UserResponse:
     logger.debug("Resolving current user from token", extra={"token_prefix": token[:8] + "..." if token else None})
-    try:
+    if cache is not None and (cached_user := cache.get(token)) is not None:
+        # Seen recently: signature and user lookup were already checked. Revocation still is
+        # not, since another worker may have logged the token out; the blacklist filter answers
+        # that locally and only a "maybe" goes on to Redis or the database
         if await service.token_service.is_token_blacklisted(token):
+            cache.discard(token)
             raise HTTPException(401, "Token has been revoked")
+        return cached_user
+    try:
+        # Verify the signature first so bad or expired tokens never reach the database
         payload = decode_jwt(token)
+        if await service.token_service.is_token_blacklisted(token):
+            raise HTTPException(401, "Token has been revoked")
         sub = payload['sub'] if isinstance(payload, dict) else getattr(payload, 'sub', None)
         user = await service.get_by_id(sub)
         if not user:
             logger.warning("Token resolved to unknown user", extra={"sub": sub})
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
         logger.info("Resolved current user", extra={"user_id": user.id})
-        return UserResponse.from_user(user)
+        current_user = UserResponse.from_user(user)
+        if cache is not None:
+            cache.set(token, current_user, payload.exp.timestamp())
+        return current_user
     except jwt.ExpiredSignatureError:
         logger.warning("Token expired")
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has expired")
@@ -1,10 +1,17 @@
-from app.dependencies.documents import get_document_service
+from app.dependencies.config import get_settings
+from app.dependencies.documents import get_document_service, get_search_cache
 from app.schemas.document import DocumentOperationResult, SearchRequest, SearchResponse
 from app.services.document import DocumentService
+from app.utils.batching import QueryBatcher
+from app.utils.caching import SearchCache
 from app.utils.deduping import get_redundant_chunk_ids
 from fastapi import Body, Depends, HTTPException, status
 from langchain_core.prompts import ChatPromptTemplate
+from functools import lru_cache
 from itertools import groupby
+from operator import attrgetter
+from typing import Optional
+import numpy as np
 from app.config.logging import logger
 
 RAG_PROMPT_TEMPLATE = """You are an assistant for question-answering tasks. Use the following pieces of retrieved context to answer the question. If you don't know the answer, just say that you don't know. Use three sentences maximum and keep the answer concise.
@@ -15,13 +22,46 @@ Answer:
 
 RAG_PROMPT = ChatPromptTemplate.from_template(RAG_PROMPT_TEMPLATE)
 
+# What RAG_PROMPT.format renders to, as a plain string: the template behind the human message prefix
+_PROMPT_STR = "Human: " + RAG_PROMPT_TEMPLATE
+
+
+def _render(question: str, context: str) -> str:
+    return _PROMPT_STR.format(question=question, context=context)
+
+# Context layout pieces, bound once instead of rebuilt per request
+_source_key = attrgetter("doc_metadata.source_file")
+_chunk_fields = attrgetter("doc_metadata.chunk_index", "content")
+_SECTION_HEADER_FMT = "=== %s ===\n\n"
+_CHUNK_FMT = "[Chunk %s]\n%s"
+_CHUNK_SEPARATOR = "\n\n"
+
+
+@lru_cache(maxsize=1)
+def get_query_batcher() -> QueryBatcher:
+    # One batcher per process so concurrent requests share its window
+    settings = get_settings()
+    return QueryBatcher(
+        get_document_service(),
+        max_batch_size=settings.vectors.search_batch_max_size,
+        max_wait_ms=settings.vectors.search_batch_window_ms
+    )
+
 
 async def get_relevant_chunks(
-    service: DocumentService = Depends(get_document_service),
+    batcher: QueryBatcher = Depends(get_query_batcher),
+    cache: Optional[SearchCache] = Depends(get_search_cache),
     query: SearchRequest = Body(...)
 ) -> SearchResponse:
+    # Deduping and prompt assembly read every result's metadata, whatever the client asked for
+    query = query.model_copy(update={"include_metadata": True})
     logger.debug("Chat pipeline: retrieving relevant chunks", extra={"k": query.k, "include_scores": query.include_scores})
-    result = await service.similarity_search(query)
+    if cache is not None:
+        cached = cache.get(query)
+        if cached is not None:
+            logger.info("Retrieved relevant chunks from cache", extra={"total_found": cached.total_found})
+            return cached
+    result = await batcher.submit(query)
     if isinstance(result, DocumentOperationResult):
         logger.warning("Chunk retrieval failed", extra={"message": result.message})
         raise HTTPException(
@@ -30,6 +70,8 @@ async def get_relevant_chunks(
         )
     else:
         logger.info("Retrieved relevant chunks", extra={"total_found": result.total_found})
+        if cache is not None:
+            cache.set(query, result)
         return result
     
 async def dedupe_chunks(
@@ -37,12 +79,15 @@ async def dedupe_chunks(
     response: SearchResponse = Depends(get_relevant_chunks),
 ) -> SearchResponse:
     logger.debug("Chat pipeline: deduping chunks", extra={"initial_count": response.total_found})
-    deduped_response = response.copy()
-    redundant_ids = await get_redundant_chunk_ids(deduped_response, service)
-    deduped_response.results = [
-        result for result in deduped_response.results if result.doc_metadata.uuid not in redundant_ids
-    ]
-    deduped_response.total_found = len(deduped_response.results)
+    redundant_ids = await get_redundant_chunk_ids(response, service)
+    results = [result for result in response.results if result.doc_metadata.uuid not in redundant_ids]
+    # A fresh response around the same results; the incoming one may be shared through the search cache
+    deduped_response = SearchResponse.model_construct(
+        query=response.query,
+        results=results,
+        total_found=len(results),
+        search_time_ms=response.search_time_ms
+    )
     logger.info("Deduping complete", extra={"removed": len(redundant_ids), "remaining": deduped_response.total_found})
     return deduped_response
 
@@ -50,13 +95,21 @@ async def rerank_chunks(
     deduped_response: SearchResponse = Depends(dedupe_chunks)
 ) -> SearchResponse:
     logger.debug("Chat pipeline: reranking chunks", extra={"count": deduped_response.total_found})
-    reranked_response = deduped_response.copy()
-    reranked_response.results = sorted(
-        reranked_response.results,
-        key=lambda result: (
-            result.relevance_score if result.relevance_score is not None else 0
-        ),
-        reverse=True  
+    results = deduped_response.results
+    if len(results) > 1:
+        scores = np.fromiter(
+            (result.relevance_score if result.relevance_score is not None else 0.0 for result in results),
+            dtype=np.float32,
+            count=len(results)
+        )
+        # Stable descending sort, so ties keep their retrieval order
+        order = np.argsort(-scores, kind="stable")
+        results = [results[i] for i in order.tolist()]
+    reranked_response = SearchResponse.model_construct(
+        query=deduped_response.query,
+        results=results,
+        total_found=deduped_response.total_found,
+        search_time_ms=deduped_response.search_time_ms
     )
     logger.info("Reranking complete", extra={"count": len(reranked_response.results)})
     return reranked_response
@@ -65,28 +118,19 @@ async def assemble_context(
     reranked_response: SearchResponse = Depends(rerank_chunks)
 ) -> str:
     logger.debug("Chat pipeline: assembling context", extra={"result_count": len(reranked_response.results)})
-    grouped_chunks = groupby(
-        reranked_response.results,
-        key = lambda result: result.doc_metadata.source_file
-    )
+    grouped_chunks = groupby(reranked_response.results, key=_source_key)
 
-    context_sections = []
+    # Every piece goes into one flat list and is joined once at the end
+    parts = ["\n\n", "=" * 50]
+    section_count = 0
     for source_file, chunks_group in grouped_chunks:
-        chunks_list = list(chunks_group)
-        
-        header = f"=== {source_file} ==="
-        source_content = [
-            f"[Chunk {chunk.doc_metadata.chunk_index}]\n{chunk.content}" 
-            for chunk in chunks_list
-        ]
-        
-        source_section = f"{header}\n\n" + "\n\n".join(source_content)
-        context_sections.append(source_section)
+        if section_count:
+            parts.append("\n\n")
+        section_count += 1
+        parts.append(_SECTION_HEADER_FMT % source_file)
+        parts.append(_CHUNK_SEPARATOR.join(_CHUNK_FMT % _chunk_fields(chunk) for chunk in chunks_group))
     
-    context = "\n\n" + "="*50 + "\n\n".join(context_sections)
-    logger.info("Context assembled", extra={"sections": len(context_sections), "length": len(context)})
+    context = "".join(parts)
+    logger.info("Context assembled", extra={"sections": section_count, "length": len(context)})
     
-    return RAG_PROMPT.format(
-        question=reranked_response.query, 
-        context=context
-    )
+    return _render(reranked_response.query, context)
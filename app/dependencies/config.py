@@ -1,7 +1,6 @@
-from app.config import Settings
-from functools import lru_cache
+from app.config import Settings, get_settings
 
-@lru_cache()
-def get_settings() -> Settings:
-    """Get cached settings instance."""
-    return Settings()
\ No newline at end of file
+__all__ = [
+    "Settings",
+    "get_settings"
+]
\ No newline at end of file
@@ -1,17 +1,53 @@
 from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine
 from app.dependencies.config import get_settings
+from app.config.logging import logger
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
+import asyncio
+import importlib.util
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
 
 app_config = get_settings()
 
 engine = create_async_engine(
     app_config.environment.db_url,
-    debug=True,
-    pool_size=5,
-    max_overflow=10
+    # SQL echo only while debugging locally; it serializes every statement into the log
+    echo=app_config.environment.debug and app_config.environment.is_development,
+    pool_size=app_config.environment.db_pool_size,
+    max_overflow=app_config.environment.db_max_overflow,
+    # Off by default: a ping is an extra round trip per checkout, and pool_recycle already
+    # retires connections before the server drops them
+    pool_pre_ping=app_config.environment.db_pool_pre_ping,
+    pool_recycle=app_config.environment.db_pool_recycle_seconds
 )
 
+async def warm_up_pool() -> None:
+    """Open pool_size connections up front so the first requests don't pay for connecting."""
+    async def ping():
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    pool_size = app_config.environment.db_pool_size
+    await asyncio.gather(*(ping() for _ in range(pool_size)))
+    logger.info("Database pool warmed", extra={"connections": pool_size})
+
+@lru_cache(maxsize=1)
+def get_redis() -> Optional["Redis"]:
+    # One pooled client per process; None when Redis is off, and callers use the database alone
+    redis_config = app_config.redis
+    if not redis_config.enabled:
+        return None
+    if importlib.util.find_spec("redis") is None:
+        logger.warning("Redis is enabled but the redis package is not installed")
+        return None
+    from redis.asyncio import Redis
+
+    return Redis(**redis_config.connection_kwargs, decode_responses=True)
+
 async def get_db():
     async with AsyncSession(engine, expire_on_commit=False) as db:
         yield db
-
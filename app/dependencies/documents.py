@@ -4,29 +4,107 @@ from app.dependencies.auth import get_current_user
 from app.dependencies.config import get_settings
 from app.config import Settings
 from app.schemas.auth import UserResponse
-from app.schemas.document import DocumentMetadata, SearchRequest
+from app.schemas.document import SearchRequest
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from pathlib import Path
 from typing import List, Optional, Dict, Any, Union
 from app.schemas.upload import UploadResult
 import uuid
+import asyncio
+import codecs
+import hashlib
+import aiofiles
+import aiofiles.os
 from datetime import datetime
 from pathlib import Path
 from datetime import datetime
+from functools import lru_cache
 from app.services.document import DocumentService
+from app.utils.caching import EmbeddingCache, SearchCache, SemanticSearchCache
+from app.utils.jobs import IngestionJobStore
+from app.utils.timestamps import to_unix_ms
 from app.config.logging import logger
 
-def get_document_service(
-    settings: Settings = Depends(get_settings)
+# Uploads are streamed to disk in 1 MiB chunks
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+@lru_cache(maxsize=1)
+def _build_document_service(
+    collection_name: str,
+    embedding_model: str,
+    persist_directory: str,
+    embedding_batch_size: int,
+    semantic_cache: Optional[SemanticSearchCache],
+    embedding_cache: Optional[EmbeddingCache]
 ) -> DocumentService:
-    logger.debug("Creating DocumentService via dependency", extra={"collection_name": settings.vectors.chroma_collection_name})
+    logger.debug("Creating DocumentService via dependency", extra={"collection_name": collection_name})
     return DocumentService(
-        collection_name=settings.vectors.chroma_collection_name,
-        embedding_model=settings.embeddings.embedding_model,
-        persist_directory=settings.documents.upload_dir
+        collection_name=collection_name,
+        embedding_model=embedding_model,
+        persist_directory=persist_directory,
+        embedding_batch_size=embedding_batch_size,
+        semantic_cache=semantic_cache,
+        embedding_cache=embedding_cache
+    )
+
+def get_document_service() -> DocumentService:
+    # The Chroma store and embeddings client are process-wide; keying the cache on the
+    # settings that shape them means reloaded settings get a fresh service
+    settings = get_settings()
+    return _build_document_service(
+        settings.vectors.chroma_collection_name,
+        settings.embeddings.embedding_model,
+        str(settings.vectors.chroma_persist_dir),
+        settings.embeddings.embedding_batch_size,
+        get_semantic_cache(),
+        get_embedding_cache()
+    )
+
+@lru_cache(maxsize=1)
+def get_search_cache() -> Optional[SearchCache]:
+    # Shared by every request; None when caching is turned off
+    settings = get_settings()
+    if not settings.vectors.search_cache_enabled:
+        return None
+    return SearchCache(
+        max_entries=settings.vectors.search_cache_max_entries,
+        ttl_seconds=settings.vectors.search_cache_ttl_seconds
+    )
+
+@lru_cache(maxsize=1)
+def get_semantic_cache() -> Optional[SemanticSearchCache]:
+    # Owned by the DocumentService, which has the query embeddings it is keyed on
+    settings = get_settings()
+    if not settings.vectors.semantic_cache_enabled:
+        return None
+    return SemanticSearchCache(
+        max_entries=settings.vectors.semantic_cache_max_entries,
+        ttl_seconds=settings.vectors.semantic_cache_ttl_seconds,
+        threshold=settings.vectors.semantic_cache_threshold
+    )
+
+@lru_cache(maxsize=1)
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    # Lives next to the Chroma data it feeds, so it survives restarts with it
+    settings = get_settings()
+    if not settings.embeddings.embedding_cache_enabled:
+        return None
+    return EmbeddingCache(
+        settings.vectors.chroma_persist_dir / "embedding_cache.sqlite3",
+        max_entries=settings.embeddings.embedding_cache_max_entries
     )
 
+@lru_cache(maxsize=1)
+def get_ingestion_jobs() -> IngestionJobStore:
+    return IngestionJobStore()
+
+async def _discard_upload(path: Path) -> None:
+    try:
+        await aiofiles.os.remove(path)
+    except FileNotFoundError:
+        pass
+
 async def validate_file(
     settings: Settings = Depends(get_settings),
     current_user: UserResponse = Depends(get_current_user),
@@ -47,11 +125,9 @@ async def validate_file(
             detail=f"Invalid or missing file extension. Allowed: {', '.join(settings.documents.allowed_file_types)}"
         )
     
-    content = await file.read()
-    await file.seek(0)
-
-    # check file size
-    if len(content) > settings.documents.max_file_size_bytes:
+    # The multipart parser already knows the size; reject oversized uploads before touching disk
+    max_bytes = settings.documents.max_file_size_bytes
+    if file.size is not None and file.size > max_bytes:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Upload is too big. Max is {settings.documents.max_file_size_mb} MB."
@@ -59,23 +135,40 @@ async def validate_file(
 
     # make file name uuid to ensure uploads are unique
     stored_filename = f"{uuid.uuid4()}{file_ext}"
-    try: 
-        with open( Path(settings.documents.upload_dir) / stored_filename, "wb") as buffer:
-            buffer.write(content)
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to upload file: {e}"
-        )
+    destination = Path(settings.documents.upload_dir) / stored_filename
 
-    # Attempt to decode content as UTF-8 for text processing
+    # Stream the upload to disk, checking size and decoding UTF-8 as chunks arrive
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    decoded_parts: List[str] = []
+    size = 0
     try:
-        decoded_content = content.decode('utf-8')
+        async with aiofiles.open(destination, "wb") as buffer:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Upload is too big. Max is {settings.documents.max_file_size_mb} MB."
+                    )
+                decoded_parts.append(decoder.decode(chunk))
+                await buffer.write(chunk)
+            decoded_parts.append(decoder.decode(b"", final=True))
+    except HTTPException:
+        await _discard_upload(destination)
+        raise
     except UnicodeDecodeError:
+        await _discard_upload(destination)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="File must be valid UTF-8 text content"
         )
+    except Exception as e:
+        await _discard_upload(destination)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to upload file: {e}"
+        )
+    decoded_content = "".join(decoded_parts)
 
     return UploadResult(
         filename=stored_filename,
@@ -85,32 +178,47 @@ async def validate_file(
         content=decoded_content
     )
 
+@lru_cache(maxsize=4)
+def get_text_splitter(chunk_size: int, chunk_overlap: int) -> RecursiveCharacterTextSplitter:
+    # The splitter is stateless between calls, so one per configuration is enough
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len
+    )
+
 async def preprocess_uploaded_file(
     settings: Settings = Depends(get_settings),
     upload: UploadResult = Depends(validate_file)
 ) -> List[Document]:
     
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=settings.documents.chunk_size,
-        chunk_overlap=settings.documents.chunk_overlap,
-        length_function=len
-    )
+    splitter = get_text_splitter(settings.documents.chunk_size, settings.documents.chunk_overlap)
 
-    chunks = splitter.split_text(upload.content)
+    # Splitting a large document is CPU-bound; keep it off the event loop
+    chunks = await asyncio.to_thread(splitter.split_text, upload.content)
 
+    # Metadata fields are known and already validated on the upload, so build
+    # the DocumentMetadata-shaped dicts directly; every chunk shares one timestamp.
+    added_at = datetime.utcnow()
+    added_at_ms = to_unix_ms(added_at)
+    added_at = added_at.isoformat()
+    # Chunk ids derive from the stored filename, which is already unique per upload;
+    # one hash per file instead of an os.urandom call per chunk
+    id_prefix = hashlib.blake2b(upload.filename.encode("utf-8"), digest_size=8).hexdigest()
     return [
         Document(
             page_content=chunk,
-            metadata=DocumentMetadata(
-                uuid=str(uuid.uuid4()),
-                owner_id=upload.owner_id,
-                source_file=upload.source_file,
-                filename=upload.filename,
-                chunk_size=len(chunk),
-                added_at=datetime.utcnow(),
-                content_type=upload.content_type,
-                chunk_index=i,
-            ).model_dump()
+            metadata={
+                "uuid": f"{id_prefix}-{i:06d}",
+                "owner_id": upload.owner_id,
+                "source_file": upload.source_file,
+                "filename": upload.filename,
+                "chunk_index": i,
+                "chunk_size": len(chunk),
+                "added_at": added_at,
+                "added_at_ms": added_at_ms,
+                "content_type": upload.content_type,
+            }
         )
         for i, chunk 
         in enumerate(chunks)
@@ -123,35 +231,35 @@ async def assemble_search_request(
     added_before: Optional[datetime] = Query(default=None),
     added_after: Optional[datetime] = Query(default=None),
     return_scores: bool = Query(default=True),
+    return_metadata: bool = Query(default=True),
+    diverse: bool = Query(default=False, description="Diversify results with maximal marginal relevance"),
+    fetch_k: int = Query(default=20, ge=1, le=200),
     current_user: UserResponse = Depends(get_current_user)
 ) -> SearchRequest:
-    # Build filters dynamically based on provided parameters
-    filter_conditions: List[Dict[str, Any]] = [
-        {"owner_id": {"$eq": current_user.id}} # always filter by current user
-    ]
-    
-    # Add source file filter if provided
-    if source_file is not None and source_file.strip():
-        filter_conditions.append({"source_file": {"$eq": source_file}})
-    
-    # Add date range filters if provided
-    if added_after is not None:
-        filter_conditions.append({"added_at": {"$gte": added_after.isoformat()}})
-    
-    if added_before is not None:
-        filter_conditions.append({"added_at": {"$lte": added_before.isoformat()}})
-    
-    # Build final filters object
-    filters = None
-    if len(filter_conditions) > 1:
+    owner_filter = {"owner_id": {"$eq": current_user.id}} # always filter by current user
+    has_source = source_file is not None and bool(source_file.strip())
+
+    # Most searches only scope by owner; skip building the $and list for them
+    if not (has_source or added_after is not None or added_before is not None):
+        filters: Dict[str, Any] = owner_filter
+    else:
+        filter_conditions: List[Dict[str, Any]] = [owner_filter]
+        if has_source:
+            filter_conditions.append({"source_file": {"$eq": source_file}})
+        # Date ranges compare numerically on the unix-ms copy of added_at
+        if added_after is not None:
+            filter_conditions.append({"added_at_ms": {"$gte": to_unix_ms(added_after)}})
+        if added_before is not None:
+            filter_conditions.append({"added_at_ms": {"$lte": to_unix_ms(added_before)}})
         filters = {"$and": filter_conditions}
-    elif len(filter_conditions) == 1:
-        filters = filter_conditions[0]
     
     return SearchRequest(
         query=query,
         k=k or 5,
         filters=filters,
-        include_scores=return_scores
+        include_scores=return_scores,
+        include_metadata=return_metadata,
+        mmr=diverse,
+        fetch_k=fetch_k
     )
 
@@ -1,5 +1,6 @@
-from app.dependencies.database import get_db
+from app.dependencies.database import get_db, get_redis
 from app.services.user import UserService
+from app.utils.auth import get_blacklist_filter
 from sqlmodel.ext.asyncio.session import AsyncSession
 from fastapi import Depends
 
@@ -7,4 +8,4 @@ from fastapi import Depends
 def get_user_service(
     db: AsyncSession = Depends(get_db)
 ) -> 'UserService':
-    return UserService(db)
\ No newline at end of file
+    return UserService(db, get_redis(), get_blacklist_filter())
\ No newline at end of file
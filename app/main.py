@@ -1,4 +1,29 @@
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
 from app.config.logging import logger, setup_logging
+from app.utils.errors import register_exception_handlers
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from app.dependencies.database import warm_up_pool
+
+    # Connect before serving, so the first requests don't queue behind connection setup
+    await warm_up_pool()
+    yield
+
+def create_app() -> FastAPI:
+    """Build the API with its routers and app-wide exception handlers."""
+    # Imported here so importing this module doesn't open the database engine or vector store
+    from app.controllers.document import document_controller
+    from app.controllers.user import user_controller
+
+    setup_logging()
+    app = FastAPI(lifespan=lifespan)
+    app.include_router(user_controller)
+    app.include_router(document_controller)
+    register_exception_handlers(app)
+    return app
 
 def main():
     # Ensure logging is configured (idempotent)
@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 import uuid
 from datetime import datetime, timedelta
 from pydantic import EmailStr
@@ -36,7 +37,7 @@ class User(SQLModel, table=True):
 class RefreshToken(SQLModel, table=True):
     __tablename__ = "refresh_tokens"
 
-    token: str = Field(primary_key=True, index=True)
+    token: str = Field(primary_key=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     expires_at: datetime = Field(default_factory=get_refresh_token_exp)
     user_id: str = Field(index=True, foreign_key='users.id', ondelete='CASCADE')
@@ -57,9 +58,11 @@ class Session(SQLModel, table=True):
 
 class Message(SQLModel, table=True):
     __tablename__ = "messages"
+    # Session history is read in order; the composite index also serves session_id lookups
+    __table_args__ = (Index('ix_messages_session_created', 'session_id', 'created_at'),)
 
     id: str = Field(primary_key=True, index=True, default_factory=get_random_uuid)
-    session_id: str = Field(index=True, foreign_key='sessions.id', ondelete='CASCADE')
+    session_id: str = Field(foreign_key='sessions.id', ondelete='CASCADE')
     created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
     updated_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
     role: Role = Field(..., index=True)
@@ -70,9 +73,11 @@ class Message(SQLModel, table=True):
 
 class BlacklistedToken(SQLModel, table=True):
     __tablename__ = "blacklisted_tokens"
+    # Unique so blacklisting is a single INSERT ... ON CONFLICT DO NOTHING
+    __table_args__ = (Index('ix_blacklisted_tokens_token', 'token', unique=True),)
 
     id: str = Field(primary_key=True, index=True, default_factory=get_random_uuid)
-    token: str = Field(index=True)
+    token: str = Field(...)
     created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
     user_id: str = Field(index=True, foreign_key='users.id', ondelete='CASCADE')
     user: 'User' = Relationship(back_populates="blacklisted_tokens")
\ No newline at end of file
@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, List
 from datetime import datetime
 
@@ -16,7 +17,9 @@ class AddDocumentsResult(DocumentOperationResult):
 class DeleteDocumentResult(DocumentOperationResult):
     deleted_count: int = 0
 
-class DocumentMetadata(SQLModel):
+class DocumentMetadata(BaseModel):
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
     uuid: str
     owner_id: str
     source_file: Optional[str] = None
@@ -24,15 +27,29 @@ class DocumentMetadata(SQLModel):
     chunk_index: Optional[int] = None
     chunk_size: Optional[int] = None 
     added_at: Optional[datetime] = None 
+    added_at_ms: Optional[int] = None
     content_type: Optional[str] = None 
 
-class DocumentChunk(SQLModel):
+class DocumentChunk(BaseModel):
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
     content: str
     doc_metadata: DocumentMetadata
 
-class SearchResult(SQLModel):
+class IngestionJob(BaseModel):
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+    job_id: str
+    owner_id: str
+    source_file: str
+    status: str = "pending"  # pending -> running -> completed | failed
+    result: Optional[AddDocumentsResult] = None
+
+class SearchResult(BaseModel):
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
     content: str 
-    doc_metadata: DocumentMetadata
+    doc_metadata: Optional[DocumentMetadata] = None  # None when the request set include_metadata=False
     relevance_score: Optional[float] = None
 
 class CollectionStats(SQLModel):
@@ -49,9 +66,16 @@ class SearchRequest(SQLModel):
     k: int = Field(default=5, ge=1, le=50)
     filters: Optional[dict] = None
     include_scores: bool = True
+    # Callers that only need content and scores can skip building metadata; the chat pipeline always sets it
+    include_metadata: bool = True
+    # Maximal marginal relevance: pick k diverse results out of the fetch_k nearest
+    mmr: bool = False
+    fetch_k: int = Field(default=20, ge=1, le=200)
+
 
+class SearchResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
 
-class SearchResponse(SQLModel):
     query: str
     results: List[SearchResult]
     total_found: int
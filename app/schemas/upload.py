@@ -1,8 +1,10 @@
-from sqlmodel import SQLModel
+from pydantic import BaseModel, ConfigDict
 from fastapi import UploadFile
 
 
-class UploadResult(SQLModel):
+class UploadResult(BaseModel):
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
     owner_id: str
     filename: str
     source_file: str
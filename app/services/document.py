@@ -1,42 +1,215 @@
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 from langchain_core.documents import Document
 from langchain_community.vectorstores import Chroma
+from langchain_community.vectorstores.utils import maximal_marginal_relevance
 from langchain_openai import OpenAIEmbeddings
 from app.schemas.document import *
+from app.utils.caching import EmbeddingCache, SemanticSearchCache
+import asyncio
+import importlib.util
+import httpx
+import numpy as np
+import sqlite3
+import threading
 import time
+import uuid
+from contextlib import closing
+from pathlib import Path
+import tiktoken
+from functools import cached_property, lru_cache
 from app.config.logging import logger
 
+
+@lru_cache(maxsize=None)
+def get_chroma_client(persist_directory: str):
+    """One persistent Chroma client per directory, shared by every collection stored there."""
+    import chromadb
+
+    logger.debug("Opening Chroma client", extra={"persist_directory": persist_directory})
+    return chromadb.PersistentClient(path=persist_directory)
+
+
+@lru_cache(maxsize=1)
+def get_embeddings_http_client() -> httpx.AsyncClient:
+    """Pooled keep-alive client shared by every embeddings instance; HTTP/2 when h2 is installed."""
+    return httpx.AsyncClient(
+        http2=importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(max_keepalive_connections=50, max_connections=200),
+        timeout=30.0
+    )
+
+
 class DocumentService:
 
-    def __init__(self, collection_name: str, embedding_model: str, persist_directory: str):
-        self.embeddings = OpenAIEmbeddings(model=embedding_model)
-        self.store = Chroma(
-            collection_name=collection_name,
-            embedding_function=self.embeddings,
-            persist_directory=persist_directory
+    # Token budget per embeddings request when ingesting, and how many requests run at once
+    EMBEDDING_BATCH_MAX_TOKENS = 7000
+    EMBEDDING_MAX_CONCURRENCY = 8
+    SOURCES_CACHE_TTL_SECONDS = 30.0
+    # Relevance/diversity trade-off for MMR searches; 1 is plain similarity, 0 is maximum diversity
+    MMR_LAMBDA = 0.5
+    SOURCES_SCAN_PAGE_SIZE = 1000
+
+    def __init__(
+        self,
+        collection_name: str,
+        embedding_model: str,
+        persist_directory: str,
+        embedding_batch_size: int = 1000,
+        semantic_cache: Optional[SemanticSearchCache] = None,
+        embedding_cache: Optional[EmbeddingCache] = None
+    ):
+        self.semantic_cache = semantic_cache
+        self.embedding_cache = embedding_cache
+        self.collection_name = collection_name
+        self.persist_directory = persist_directory
+        # Serializes writes with clear_collection so none lands in the dropped collection mid-reset
+        self._write_lock = threading.Lock()
+        # (record count, expiry, sources) from the last list_sources call
+        self._sources_cache: Optional[Tuple[int, float, List[str]]] = None
+        # chunk_size is how many texts go into each embeddings request
+        self.embeddings = OpenAIEmbeddings(
+            model=embedding_model,
+            chunk_size=embedding_batch_size,
+            http_async_client=get_embeddings_http_client()
         )
+        self.store = self._open_store()
         logger.info("Initialized DocumentService", extra={"collection_name": collection_name, "embedding_model": embedding_model, "persist_directory": persist_directory})
 
-    def get_embeddings(self, ids: List[str]) -> List[List[float]]:
-        logger.debug("Fetching embeddings", extra={"count": len(ids)})
+    def _open_store(self) -> Chroma:
+        return Chroma(
+            collection_name=self.collection_name,
+            embedding_function=self.embeddings,
+            client=get_chroma_client(self.persist_directory)
+        )
+
+    def get_embeddings(self, ids: List[str]) -> np.ndarray:
+        """L2-normalized float32 embeddings, one row per id in the order given (zeros for unknown ids)."""
+        logger.opt(lazy=True).debug("Fetching embeddings", extra=lambda: {"count": len(ids)})
         result = self.store._collection.get(ids=ids, include=['embeddings'])
-        embeddings = result['embeddings']
-        logger.debug("Fetched embeddings", extra={"returned": len(embeddings) if embeddings else 0})
+        found = np.asarray(result['embeddings'], dtype=np.float32)
+        # Chroma returns rows in storage order and skips missing ids, so place them by id
+        positions = {id_: position for position, id_ in enumerate(ids)}
+        embeddings = np.zeros((len(ids), found.shape[1] if found.ndim == 2 else 0), dtype=np.float32)
+        if len(found):
+            embeddings[[positions[id_] for id_ in result['ids']]] = found
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        np.divide(embeddings, norms, out=embeddings, where=norms > 0)
+        logger.opt(lazy=True).debug("Fetched embeddings", extra=lambda: {"returned": len(found)})
         return embeddings
 
+    @cached_property
+    def _encoding(self) -> tiktoken.Encoding:
+        try:
+            return tiktoken.encoding_for_model(self.embeddings.model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+
+    def _batch_by_tokens(self, documents: List[Document], max_tokens: int) -> List[List[Document]]:
+        """Group documents, in order, into batches whose combined token count stays within max_tokens."""
+        token_counts = map(len, self._encoding.encode_batch([document.page_content for document in documents]))
+        batches: List[List[Document]] = []
+        batch: List[Document] = []
+        batch_tokens = 0
+        for document, tokens in zip(documents, token_counts):
+            if batch and batch_tokens + tokens > max_tokens:
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(document)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        return batches
+
+    async def _embed_texts(self, texts: List[str]) -> List[List[float]]:
+        if self.embedding_cache is None:
+            return await self.embeddings.aembed_documents(texts)
+        # Only text this model hasn't embedded before goes to the API
+        keys = [EmbeddingCache.make_key(self.embeddings.model, text) for text in texts]
+        vectors = await asyncio.to_thread(self.embedding_cache.get_many, keys)
+        misses = [position for position, key in enumerate(keys) if key not in vectors]
+        if misses:
+            fresh = await self.embeddings.aembed_documents([texts[position] for position in misses])
+            new_entries = [(keys[position], vector) for position, vector in zip(misses, fresh)]
+            await asyncio.to_thread(self.embedding_cache.set_many, new_entries)
+            vectors.update(new_entries)
+        logger.opt(lazy=True).debug("Embedded batch", extra=lambda: {"count": len(texts), "cache_hits": len(texts) - len(misses)})
+        return [vectors[key] for key in keys]
+
+    def _write_batch(self, batch: List[Document], embeddings: List[List[float]]) -> List[str]:
+        # Chunks carry their own uuid, so the Chroma id matches what search results report
+        ids = [document.id or document.metadata.get("uuid") or str(uuid.uuid4()) for document in batch]
+        with self._write_lock:
+            self.store._collection.add(
+                ids=ids,
+                embeddings=embeddings,
+                documents=[document.page_content for document in batch],
+                metadatas=[document.metadata for document in batch]
+            )
+        return ids
+
+    def _delete_ids(self, ids: List[str]) -> None:
+        with self._write_lock:
+            self.store.delete(ids)
+
+    def _delete_where(self, where: dict) -> int:
+        with self._write_lock:
+            # Ids only, just to report how many chunks go; the delete itself filters in Chroma
+            document_ids = self.store.get(where=where, include=[]).get("ids", [])
+            if document_ids:
+                self.store._collection.delete(where=where)
+        return len(document_ids)
+
+    async def _embed_and_write(self, batches: List[List[Document]]) -> List[str]:
+        """Embed batches concurrently while earlier ones are written, in order, as soon as they're ready."""
+        # The queue bound caps embedding requests in flight; the producer waits once it's full
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.EMBEDDING_MAX_CONCURRENCY)
+
+        async def produce() -> None:
+            for batch in batches:
+                embedding = asyncio.ensure_future(self._embed_texts([document.page_content for document in batch]))
+                try:
+                    await queue.put((batch, embedding))
+                except asyncio.CancelledError:
+                    embedding.cancel()
+                    raise
+            await queue.put(None)
+
+        producer = asyncio.ensure_future(produce())
+        ids: List[str] = []
+        try:
+            while (item := await queue.get()) is not None:
+                batch, embedding = item
+                # Writes stay sequential on one thread; the next batches keep embedding meanwhile
+                ids.extend(await asyncio.to_thread(self._write_batch, batch, await embedding))
+            await producer
+        finally:
+            producer.cancel()
+            while not queue.empty():
+                item = queue.get_nowait()
+                if item is not None:
+                    item[1].cancel()
+        return ids
+
+    def _invalidate_caches(self) -> None:
+        # Any write can change what a cached query or source listing should return
+        self._sources_cache = None
+        if self.semantic_cache is not None:
+            self.semantic_cache.clear()
+
     async def add_document(self, content: str, metadata: DocumentMetadata) -> AddDocumentResult:
-        logger.debug("Adding single document", extra={"source_file": metadata.source_file, "chunk_index": metadata.chunk_index})
+        logger.opt(lazy=True).debug("Adding single document", extra=lambda: {"source_file": metadata.source_file, "chunk_index": metadata.chunk_index})
         try: 
             result =  await self.store.aadd_documents([Document(page_content=content, metadata=metadata.model_dump())])
-            logger.info("Added document", extra={"uuid": result[0], "source_file": metadata.source_file, "chunk_index": metadata.chunk_index})
-            return AddDocumentResult(
+            self._invalidate_caches()
+            logger.opt(lazy=True).info("Added document", extra=lambda: {"uuid": result[0], "source_file": metadata.source_file, "chunk_index": metadata.chunk_index})
+            return AddDocumentResult.model_construct(
                 success=True,
                 message="Successfully added document to store",
                 uuid=result[0]
             )
         except Exception as e:
             logger.exception("Failed to add document", extra={"source_file": metadata.source_file, "chunk_index": metadata.chunk_index})
-            return AddDocumentResult(
+            return AddDocumentResult.model_construct(
                 success=False,
                 message=f"Failed to add document to store: {str(e)}",
                 uuid=None
@@ -48,10 +221,14 @@ class DocumentService:
         logger.debug("Adding documents", extra={"count": len(documents) if documents else 0})
         try:
             start = time.perf_counter()
-            result = await self.store.aadd_documents(documents)
+            # Write token-budgeted batches with their own vectors, so the store doesn't embed
+            # the texts a second time, overlapping each write with the embedding of later batches
+            batches = await asyncio.to_thread(self._batch_by_tokens, documents or [], self.EMBEDDING_BATCH_MAX_TOKENS)
+            result = await self._embed_and_write(batches)
+            self._invalidate_caches()
             duration_ms = (time.perf_counter() - start) * 1000
-            logger.info("Added documents", extra={"added_count": len(result), "duration_ms": round(duration_ms, 2)})
-            return AddDocumentsResult(
+            logger.info("Added documents", extra={"added_count": len(result), "batches": len(batches), "duration_ms": round(duration_ms, 2)})
+            return AddDocumentsResult.model_construct(
                 success=True,
                 message=f"Successfully added documents to store",
                 added_count=len(result),
@@ -59,7 +236,7 @@ class DocumentService:
             )
         except Exception as e:
             logger.exception("Failed to add documents", extra={"count": len(documents) if documents else 0})
-            return AddDocumentsResult(
+            return AddDocumentsResult.model_construct(
                 success=False,
                 message=f"Failed to add documents to store: {str(e)}",
                 added_count=0,
@@ -68,29 +245,32 @@ class DocumentService:
         
     def update_document(self, document_id: str, updated_document: Document) -> DocumentOperationResult:
         try:
-            self.store.update_document(document_id, updated_document)
-            return DocumentOperationResult(
+            with self._write_lock:
+                self.store.update_document(document_id, updated_document)
+                self._invalidate_caches()
+            return DocumentOperationResult.model_construct(
                 success=True,
                 message="Successfully updated document"
             )
         except Exception as e:
-            return DocumentOperationResult(
+            return DocumentOperationResult.model_construct(
                 success=False,
                 message=f"Failed to update document: {str(e)}"
             )
 
     async def delete_document(self, document_id: str) -> DocumentOperationResult:
-        logger.debug("Deleting document", extra={"document_id": document_id})
+        logger.opt(lazy=True).debug("Deleting document", extra=lambda: {"document_id": document_id})
         try:
-            await self.store.adelete([document_id])
-            logger.info("Deleted document", extra={"document_id": document_id})
-            return DocumentOperationResult(
+            await asyncio.to_thread(self._delete_ids, [document_id])
+            self._invalidate_caches()
+            logger.opt(lazy=True).info("Deleted document", extra=lambda: {"document_id": document_id})
+            return DocumentOperationResult.model_construct(
                 success=True,
                 message="Successfully deleted document"
             )
         except Exception as e:
             logger.exception("Failed to delete document", extra={"document_id": document_id})
-            return DocumentOperationResult(
+            return DocumentOperationResult.model_construct(
                 success=False,
                 message=f"Failed to delete document: {str(e)}"
             )
@@ -98,16 +278,17 @@ class DocumentService:
     async def delete_documents(self, document_ids: List[str]) -> DeleteDocumentResult:
         logger.debug("Deleting documents", extra={"count": len(document_ids)})
         try:
-            await self.store.adelete(document_ids)
+            await asyncio.to_thread(self._delete_ids, document_ids)
+            self._invalidate_caches()
             logger.info("Deleted documents", extra={"deleted_count": len(document_ids)})
-            return DeleteDocumentResult(
+            return DeleteDocumentResult.model_construct(
                 success=True,
                 message=f"Successfully deleted {len(document_ids)} documents",
                 deleted_count=len(document_ids)
             )
         except Exception as e:
             logger.exception("Failed to delete documents", extra={"count": len(document_ids)})
-            return DeleteDocumentResult(
+            return DeleteDocumentResult.model_construct(
                 success=False,
                 message=f"Failed to delete documents: {str(e)}",
                 deleted_count=0
@@ -116,20 +297,19 @@ class DocumentService:
     async def delete_by_source(self, source_file: str, owner_id: str) -> DeleteDocumentResult:
         logger.debug("Deleting by source", extra={"source_file": source_file})
         try:
-            collection_data = self.store.get(where={"source_file": source_file, "owner_id": owner_id})
-            document_ids = collection_data.get("ids", [])
-            logger.debug("Found documents to delete", extra={"count": len(document_ids)})
-            if document_ids:  # Only delete if there are documents to delete
-                await self.delete_documents(document_ids)
-            logger.info("Deleted documents by source", extra={"source_file": source_file, "deleted_count": len(document_ids)})
-            return DeleteDocumentResult(
+            where = {"$and": [{"source_file": {"$eq": source_file}}, {"owner_id": {"$eq": owner_id}}]}
+            deleted_count = await asyncio.to_thread(self._delete_where, where)
+            if deleted_count:
+                self._invalidate_caches()
+            logger.info("Deleted documents by source", extra={"source_file": source_file, "deleted_count": deleted_count})
+            return DeleteDocumentResult.model_construct(
                 success=True,
-                message=f"Successfully deleted {len(document_ids)} documents with source file: {source_file}",
-                deleted_count=len(document_ids)
+                message=f"Successfully deleted {deleted_count} documents with source file: {source_file}",
+                deleted_count=deleted_count
             )
         except Exception as e:
             logger.exception("Failed to delete by source", extra={"source_file": source_file})
-            return DeleteDocumentResult(
+            return DeleteDocumentResult.model_construct(
                 success=False,
                 message=f"Failed to delete documents with source file {source_file}: {str(e)}",
                 deleted_count=0
@@ -138,100 +318,215 @@ class DocumentService:
     def clear_collection(self) -> DocumentOperationResult:
         logger.warning("Clearing entire collection")
         try:
-            self.store.delete_collection()
+            with self._write_lock:
+                self.store.delete_collection()
+                # The old handle points at a dropped collection; reopen an empty one so
+                # this service keeps working without being rebuilt
+                self.store = self._open_store()
+                self._invalidate_caches()
             logger.info("Collection cleared")
-            return DocumentOperationResult(
+            return DocumentOperationResult.model_construct(
                 success=True,
                 message=f"Successfully deleted collection"
             )
         except Exception as e:
             logger.exception("Failed to clear collection")
-            return DocumentOperationResult(
+            return DocumentOperationResult.model_construct(
                 success=False,
                 message=f"Failed to delete collection: {str(e)}"
             )
 
     async def similarity_search(self, request: SearchRequest) -> SearchResponse | DocumentOperationResult:
         try:
-            logger.debug("Starting similarity search", extra={"k": request.k, "include_scores": request.include_scores, "has_filters": bool(request.filters)})
+            logger.opt(lazy=True).debug("Starting similarity search", extra=lambda: {"k": request.k, "include_scores": request.include_scores, "has_filters": bool(request.filters)})
             search_start = time.perf_counter()
-            if request.include_scores:
-                results = await self.store.asimilarity_search_with_relevance_scores(
-                    query=request.query,
-                    k=request.k,
-                    filter=request.filters
-                )
-                duration_ms = (time.perf_counter() - search_start) * 1000
-                logger.info("Similarity search completed", extra={"found": len(results), "duration_ms": round(duration_ms, 2)})
-                return SearchResponse(
-                    query=request.query,
-                    results=[
-                        SearchResult(
-                            content=document.page_content,
-                            doc_metadata=DocumentMetadata(
-                                uuid=document.metadata.get('uuid', ''),
-                                source_file=document.metadata.get('source_file'),
-                                filename=document.metadata.get('filename'),
-                                chunk_index=document.metadata.get('chunk_index'),
-                                chunk_size=document.metadata.get('chunk_size'),
-                                added_at=document.metadata.get('added_at'),
-                                content_type=document.metadata.get('content_type')
-                            ),
-                            relevance_score=score
-                        )
-                        for document, score 
-                        in results
-                    ],
-                    total_found=len(results),
-                    search_time_ms=time.perf_counter()-search_start
-                )
-            else:
-                docs = await self.store.asimilarity_search(
-                    query=request.query,
-                    k=request.k,
-                    filter=request.filters
-                )
-                duration_ms = (time.perf_counter() - search_start) * 1000
-                logger.info("Similarity search completed", extra={"found": len(docs), "duration_ms": round(duration_ms, 2)})
-                return SearchResponse(
-                    query=request.query,
-                    results=[
-                        SearchResult(
-                            content=document.page_content,
-                            doc_metadata=DocumentMetadata(
-                                uuid=document.metadata.get('uuid', ''),
-                                source_file=document.metadata.get('source_file'),
-                                filename=document.metadata.get('filename'),
-                                chunk_index=document.metadata.get('chunk_index'),
-                                chunk_size=document.metadata.get('chunk_size'),
-                                added_at=document.metadata.get('added_at'),
-                                content_type=document.metadata.get('content_type')
-                            ),
-                        )
-                        for document
-                        in docs
-                    ],
-                    total_found=len(docs),
-                    search_time_ms=time.perf_counter() - search_start
-                )
+            # Embed once; the same vector keys the semantic cache and drives the search
+            embedding = await self.embeddings.aembed_query(request.query)
+            if self.semantic_cache is not None:
+                cached = self.semantic_cache.get(request, embedding)
+                if cached is not None:
+                    logger.debug("Similarity search served from semantic cache")
+                    return cached
+            pairs = await asyncio.to_thread(self._search_by_vector, embedding, request)
+            duration_ms = (time.perf_counter() - search_start) * 1000
+            logger.opt(lazy=True).info("Similarity search completed", extra=lambda: {"found": len(pairs), "duration_ms": round(duration_ms, 2)})
+            response = SearchResponse.model_construct(
+                query=request.query,
+                results=[self._to_search_result(document, score, request.include_metadata) for document, score in pairs],
+                total_found=len(pairs),
+                search_time_ms=duration_ms
+            )
+            if self.semantic_cache is not None:
+                self.semantic_cache.set(request, embedding, response)
+            return response
         except Exception as e:
             logger.exception("Similarity search failed")
-            return DocumentOperationResult(
+            return DocumentOperationResult.model_construct(
+                success=False,
+                message=f"Failed to search collection: {str(e)}"
+            )
+
+    @staticmethod
+    def _to_search_result(document: Document, score: Optional[float] = None, include_metadata: bool = True) -> SearchResult:
+        if not include_metadata:
+            return SearchResult.model_construct(content=document.page_content, doc_metadata=None, relevance_score=score)
+        metadata = document.metadata
+        return SearchResult.model_construct(
+            content=document.page_content,
+            doc_metadata=DocumentMetadata.model_construct(
+                uuid=metadata.get('uuid', ''),
+                owner_id=metadata.get('owner_id'),
+                source_file=metadata.get('source_file'),
+                filename=metadata.get('filename'),
+                chunk_index=metadata.get('chunk_index'),
+                chunk_size=metadata.get('chunk_size'),
+                added_at=metadata.get('added_at'),
+                added_at_ms=metadata.get('added_at_ms'),
+                content_type=metadata.get('content_type')
+            ),
+            relevance_score=score
+        )
+
+    def _search_by_vector(self, embedding: List[float], request: SearchRequest) -> List[Tuple[Document, Optional[float]]]:
+        if request.mmr:
+            results = self._mmr_search_by_vector(embedding, request)
+        else:
+            results = self.store.similarity_search_by_vector_with_relevance_scores(
+                embedding=embedding,
+                k=request.k,
+                filter=request.filters
+            )
+        if not request.include_scores:
+            return [(document, None) for document, _ in results]
+        # Chroma returns distances; convert them the same way the query-text search does
+        relevance_fn = self.store._select_relevance_score_fn()
+        return [(document, relevance_fn(distance)) for document, distance in results]
+
+    def _mmr_search_by_vector(self, embedding: List[float], request: SearchRequest) -> List[Tuple[Document, float]]:
+        # One query returns the candidates with their vectors, so MMR needs no second lookup
+        candidates = self.store._collection.query(
+            query_embeddings=[embedding],
+            n_results=max(request.fetch_k, request.k),
+            where=request.filters,
+            include=["documents", "metadatas", "distances", "embeddings"]
+        )
+        candidate_embeddings = candidates["embeddings"][0]
+        if len(candidate_embeddings) == 0:
+            return []
+        selected = maximal_marginal_relevance(
+            np.asarray(embedding, dtype=np.float32),
+            candidate_embeddings,
+            k=request.k,
+            lambda_mult=self.MMR_LAMBDA
+        )
+        return [
+            (
+                Document(page_content=candidates["documents"][0][i], metadata=candidates["metadatas"][0][i] or {}),
+                candidates["distances"][0][i]
+            )
+            for i in selected
+        ]
+
+    async def similarity_search_batch(self, requests: List[SearchRequest]) -> List[SearchResponse | DocumentOperationResult]:
+        """Embed all queries in one model call, then run their vector searches concurrently."""
+        if not requests:
+            return []
+        logger.opt(lazy=True).debug("Starting batched similarity search", extra=lambda: {"batch_size": len(requests)})
+        search_start = time.perf_counter()
+        try:
+            embeddings = await self.embeddings.aembed_documents([request.query for request in requests])
+        except Exception as e:
+            logger.exception("Batched query embedding failed", extra={"batch_size": len(requests)})
+            failure = DocumentOperationResult.model_construct(
                 success=False,
                 message=f"Failed to search collection: {str(e)}"
             )
+            return [failure] * len(requests)
+
+        responses: List[Optional[SearchResponse | DocumentOperationResult]] = [None] * len(requests)
+        if self.semantic_cache is not None:
+            for position, (request, embedding) in enumerate(zip(requests, embeddings)):
+                responses[position] = self.semantic_cache.get(request, embedding)
+        pending = [position for position, response in enumerate(responses) if response is None]
+
+        searches = await asyncio.gather(
+            *(
+                asyncio.to_thread(self._search_by_vector, embeddings[position], requests[position])
+                for position in pending
+            ),
+            return_exceptions=True
+        )
+
+        for position, results in zip(pending, searches):
+            request = requests[position]
+            if isinstance(results, Exception):
+                logger.opt(exception=results).error("Similarity search failed")
+                responses[position] = DocumentOperationResult.model_construct(
+                    success=False,
+                    message=f"Failed to search collection: {str(results)}"
+                )
+                continue
+            response = SearchResponse.model_construct(
+                query=request.query,
+                results=[self._to_search_result(document, score, request.include_metadata) for document, score in results],
+                total_found=len(results),
+                search_time_ms=(time.perf_counter() - search_start) * 1000
+            )
+            if self.semantic_cache is not None:
+                self.semantic_cache.set(request, embeddings[position], response)
+            responses[position] = response
+        duration_ms = (time.perf_counter() - search_start) * 1000
+        logger.opt(lazy=True).info("Batched similarity search completed", extra=lambda: {"batch_size": len(requests), "cache_hits": len(requests) - len(pending), "duration_ms": round(duration_ms, 2)})
+        return responses
 
     def get_document_count(self) -> int:
-        collection_data = self.store.get(include=["metadatas"])
-        return len(collection_data["ids"]) if collection_data.get("ids") else 0
+        # A COUNT in the store, rather than loading every record just to measure the id list
+        return self.store._collection.count()
 
     def list_sources(self) -> List[str]:
-        collection_data = self.store.get(include=["metadatas"])
-        return list(set([
-            metadata.get("source_file", "unknown")
-            for metadata in collection_data.get("metadatas", [])
-            if metadata.get("source_file")
-        ]))
+        count = self.store._collection.count()
+        cached = self._sources_cache
+        if cached is not None and cached[0] == count and cached[1] > time.monotonic():
+            return cached[2]
+        try:
+            sources = self._distinct_sources_sql()
+        except sqlite3.Error:
+            sources = []
+        if not sources and count:
+            # Chroma's tables are private: a schema that still parses but matches nothing looks
+            # like an empty result, so only the scan can say a non-empty collection has no sources
+            logger.debug("Falling back to a metadata scan for sources", extra={"persist_directory": self.persist_directory})
+            sources = self._distinct_sources_scan()
+        self._sources_cache = (count, time.monotonic() + self.SOURCES_CACHE_TTL_SECONDS, sources)
+        return sources
+
+    def _distinct_sources_sql(self) -> List[str]:
+        # Let Chroma's sqlite backend do the DISTINCT over this collection's metadata
+        database = Path(self.persist_directory) / "chroma.sqlite3"
+        with closing(sqlite3.connect(f"{database.as_uri()}?mode=ro", uri=True)) as connection:
+            rows = connection.execute(
+                """
+                SELECT DISTINCT em.string_value
+                FROM embedding_metadata em
+                JOIN embeddings e ON e.id = em.id
+                JOIN segments s ON s.id = e.segment_id
+                WHERE s.collection = ? AND em.key = 'source_file' AND em.string_value != ''
+                """,
+                (str(self.store._collection.id),)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def _distinct_sources_scan(self) -> List[str]:
+        # Page through metadata only, keeping just the distinct source names
+        sources: set = set()
+        offset = 0
+        while True:
+            page = self.store.get(include=["metadatas"], limit=self.SOURCES_SCAN_PAGE_SIZE, offset=offset)
+            metadatas = page.get("metadatas") or []
+            sources.update(metadata["source_file"] for metadata in metadatas if metadata and metadata.get("source_file"))
+            if len(metadatas) < self.SOURCES_SCAN_PAGE_SIZE:
+                return list(sources)
+            offset += self.SOURCES_SCAN_PAGE_SIZE
 
     def get_stats(self) -> CollectionStats:
         try:
@@ -248,7 +543,7 @@ class DocumentService:
             # Chroma typically uses cosine distance as default
             distance_metric = "cosine"
             
-            return CollectionStats(
+            return CollectionStats.model_construct(
                 collection_name=collection_name,
                 document_count=document_count,
                 sources=sources,
@@ -259,7 +554,7 @@ class DocumentService:
         except Exception as e:
             logger.exception("Failed to get collection stats")
             # Return empty stats in case of error
-            return CollectionStats(
+            return CollectionStats.model_construct(
                 collection_name=getattr(self.store._collection, 'name', 'unknown'),
                 document_count=0,
                 sources=[],
@@ -1,90 +1,179 @@
 from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models import RefreshToken, BlacklistedToken
 from app.schemas.auth import Token, JWTClaims
-from app.utils.auth import create_jwt, create_refresh_token
-from app.utils.errors import handle_unchecked_errors
-from sqlmodel import select, func, delete
+from app.utils.auth import create_jwt, create_refresh_token, decode_jwt
+from app.utils.caching import BlacklistFilter
+from sqlmodel import select, delete
+from sqlalchemy import exists
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from app.config.logging import logger
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 from fastapi import HTTPException, status
+import hashlib
+import time
+from datetime import datetime, timedelta
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
 
 
 class TokenService:
+    """Refresh tokens and the access-token blacklist, with Redis in front of the database when configured.
+
+    The database stays the source of truth. An optional Bloom filter answers the common "not
+    blacklisted" case locally; Redis only caches blacklist hits behind it, since without the filter
+    every live token would miss Redis and still need the database. Redis entries carry the token's
+    remaining lifetime as their TTL, so they expire with the token and need no cleanup. A Redis miss
+    or failure is never final: the database is asked, and a hit there is written back.
+    """
 
-    def __init__(self, db: AsyncSession):
+    BLACKLIST_KEY_PREFIX = "bl:"
+    # Each filter sync re-reads this far back, for rows created before they were committed
+    BLACKLIST_SYNC_OVERLAP_SECONDS = 30
+    # Rows removed per statement (and per commit) by revoke_all_tokens
+    REVOKE_BATCH_SIZE = 1000
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        redis: Optional["Redis"] = None,
+        blacklist_filter: Optional[BlacklistFilter] = None
+    ):
         self.db = db
+        self.redis = redis
+        self.blacklist_filter = blacklist_filter
+
+    @classmethod
+    def _blacklist_key(cls, access_token: str) -> str:
+        # Access tokens are long; a digest keeps keys small and the token itself out of Redis
+        return cls.BLACKLIST_KEY_PREFIX + hashlib.sha256(access_token.encode("utf-8")).hexdigest()
+
+    async def _cache_blacklisted(self, access_token: str) -> None:
+        """Remember a blacklisted token in Redis until it would have expired; failures only cost a cache entry."""
+        try:
+            ttl = int(decode_jwt(access_token).exp.timestamp() - time.time())
+            if ttl > 0:
+                await self.redis.set(self._blacklist_key(access_token), 1, ex=ttl)
+        except Exception:
+            logger.warning("Failed to cache blacklisted token in Redis", exc_info=True)
 
-    @handle_unchecked_errors
     async def get_refresh_token(self, refresh_token: str) -> Optional[RefreshToken]:
         stmt = select(RefreshToken).where(RefreshToken.token == refresh_token)
-        token = (await self.db.execute(stmt)).first_or_none()
-        return token
+        return (await self.db.execute(stmt)).scalar_one_or_none()
 
-    @handle_unchecked_errors
-    async def create_refresh_token(self, refresh_token: str):
-        token = RefreshToken(token=refresh_token)
+    async def create_refresh_token(self, refresh_token: str, user_id: str):
+        token = RefreshToken(token=refresh_token, user_id=user_id)
         self.db.add(token)
+        # Every column is set client-side, so there's nothing to refresh from the database
         await self.db.commit()
-        await self.db.refresh(token)
 
-    @handle_unchecked_errors
     async def delete_refresh_token(self, refresh_token: str):
-        stmt = select(RefreshToken).where(RefreshToken.token == refresh_token)
-        token = (await self.db.execute(stmt)).first_or_none()
-        if token:
-            self.db.delete(token)
-            await self.db.commit()
+        # One DELETE by primary key; nothing to load first
+        await self.db.execute(delete(RefreshToken).where(RefreshToken.token == refresh_token))
+        await self.db.commit()
 
-    @handle_unchecked_errors
     async def blacklist_token(self, access_token: str, user_id: str):
+        # One atomic statement: a row comes back only if this call did the blacklisting
         stmt = (
-            select(BlacklistedToken)
-            .where(BlacklistedToken.access_token == access_token)
+            pg_insert(BlacklistedToken)
+            .values(token=access_token, user_id=user_id)
+            .on_conflict_do_nothing(index_elements=[BlacklistedToken.token])
+            .returning(BlacklistedToken.id)
         )
-        if token := (await self.db.execute(stmt)).first_or_none():
+        inserted = (await self.db.execute(stmt)).scalar_one_or_none()
+        await self.db.commit()
+        if inserted is None:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="Token is already blacklisted"
             )
+        if self.blacklist_filter is not None:
+            self.blacklist_filter.add(access_token)
+        if self.redis is not None and self.blacklist_filter is not None:
+            # The row is committed; if this write fails, lookups still find it in the database
+            await self._cache_blacklisted(access_token)
+
+    async def _sync_blacklist_filter(self) -> bool:
+        """Pull blacklist entries created since the last sync into the filter; False if that failed."""
+        blacklist_filter = self.blacklist_filter
+        now = datetime.utcnow()
+        if blacklist_filter.synced_through is None:
+            # Nothing older than one token lifetime can still match a valid token
+            since = now - timedelta(seconds=blacklist_filter.token_lifetime_seconds)
         else:
-            token = BlacklistedToken(access_token=access_token, user_id=user_id)
-            self.db.add(token)
-            await self.db.commit()
+            since = blacklist_filter.synced_through - timedelta(seconds=self.BLACKLIST_SYNC_OVERLAP_SECONDS)
+        try:
+            stmt = select(BlacklistedToken.token).where(BlacklistedToken.created_at >= since)
+            tokens = (await self.db.execute(stmt)).scalars().all()
+        except Exception:
+            logger.warning("Failed to sync the blacklist filter", exc_info=True)
+            return False
+        for token in tokens:
+            blacklist_filter.add(token)
+        blacklist_filter.mark_synced(now)
+        logger.opt(lazy=True).debug("Synced blacklist filter", extra=lambda: {"new_entries": len(tokens)})
+        return True
+
+    async def _is_blacklisted_in_db(self, access_token: str) -> bool:
+        # EXISTS answers from the token index alone; no row comes back to hydrate
+        stmt = select(exists().where(BlacklistedToken.token == access_token))
+        return bool((await self.db.execute(stmt)).scalar())
 
-    @handle_unchecked_errors
     async def is_token_blacklisted(self, access_token: str) -> bool:
-        stmt = select(BlacklistedToken).where(BlacklistedToken.token == access_token)
-        token = (await self.db.execute(stmt)).scalar_one_or_none()
-        return token is not None
+        if self.blacklist_filter is None:
+            # Redis would only add a round trip in front of the query every live token needs
+            return await self._is_blacklisted_in_db(access_token)
+        in_sync = not self.blacklist_filter.needs_sync() or await self._sync_blacklist_filter()
+        # Bloom filters have no false negatives: a miss means the token was never blacklisted
+        if in_sync and not self.blacklist_filter.might_contain(access_token):
+            return False
+        if self.redis is not None:
+            # Only a hit is trusted: keys can be evicted, flushed, or predate Redis
+            try:
+                if await self.redis.exists(self._blacklist_key(access_token)):
+                    return True
+            except Exception:
+                logger.warning("Redis blacklist lookup failed; using the database", exc_info=True)
+        blacklisted = await self._is_blacklisted_in_db(access_token)
+        if blacklisted and self.redis is not None:
+            await self._cache_blacklisted(access_token)
+        return blacklisted
 
-    @handle_unchecked_errors
     async def refresh_token(self, refresh_token: str) -> Token:
-        # Validate refresh token exists
-        stored_token = await self.get_refresh_token(refresh_token)
-        if not stored_token:
+        # Claim and remove the old token in one statement, so a token can only be rotated once
+        stmt = (
+            delete(RefreshToken)
+            .where(RefreshToken.token == refresh_token)
+            .returning(RefreshToken.user_id)
+        )
+        user_id = (await self.db.execute(stmt)).scalar_one_or_none()
+        if user_id is None:
             raise HTTPException(401, "Invalid refresh token")
 
         # Create new access token
-        claims = JWTClaims.new(stored_token.user_id)
+        claims = JWTClaims.new(user_id)
         new_access_token = create_jwt(claims)
         new_refresh_token = create_refresh_token()
 
-        # Replace old refresh token
-        await self.delete_refresh_token(refresh_token)
-        await self.create_refresh_token(new_refresh_token)
+        # The replacement goes in the same transaction as the delete: one commit for the rotation
+        self.db.add(RefreshToken(token=new_refresh_token, user_id=user_id))
+        await self.db.commit()
 
         return Token(access_token=new_access_token, refresh_token=new_refresh_token)
 
-    @handle_unchecked_errors
     async def revoke_all_tokens(self) -> int:
         try:
-            # Count tokens before deletion for logging
-            count_stmt = select(func.count(RefreshToken.token))
-            token_count = (await self.db.execute(count_stmt)).scalar()
-
-            # Bulk delete
-            await self.db.execute(delete(RefreshToken))
-            await self.db.commit()
+            # Delete in short batches, each its own transaction, so logins and refreshes
+            # aren't stuck behind one long delete holding locks on the whole table
+            batch = select(RefreshToken.token).limit(self.REVOKE_BATCH_SIZE).scalar_subquery()
+            # Counted from what the deletes report, not a separate COUNT that could race with them
+            token_count = 0
+            while True:
+                result = await self.db.execute(delete(RefreshToken).where(RefreshToken.token.in_(batch)))
+                await self.db.commit()
+                token_count += result.rowcount
+                if result.rowcount < self.REVOKE_BATCH_SIZE:
+                    break
 
             logger.warning("Revoked all refresh tokens", extra={"count": token_count})
             return token_count
@@ -1,23 +1,31 @@
 from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models import User
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 from app.schemas.auth import UserResponse, UserCredentials, UserCreate, Token, JWTClaims
 from sqlmodel import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from fastapi import HTTPException, status, Depends
 
-from app.utils.auth import verify_password, hash_password, create_jwt, create_refresh_token
+from app.utils.auth import verify_and_update_password, hash_password, create_jwt, create_refresh_token
 from app.config.logging import logger
-from app.utils.errors import handle_unchecked_errors
 from app.services.token import TokenService
+from app.utils.caching import BlacklistFilter
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
 
 
 class UserService:
 
-    def __init__(self, db: AsyncSession):
+    def __init__(
+        self,
+        db: AsyncSession,
+        redis: Optional["Redis"] = None,
+        blacklist_filter: Optional[BlacklistFilter] = None
+    ):
         self.db = db
-        self.token_service = TokenService(db)
+        self.token_service = TokenService(db, redis, blacklist_filter)
 
-    @handle_unchecked_errors
     async def get_by_id(self, user_id: str) -> Optional[UserResponse]:
         logger.debug("Fetching user by id", extra={"user_id": user_id})
         stmt = select(User).where(User.id == user_id)
@@ -31,7 +39,6 @@ class UserService:
         logger.info("User fetched by id", extra={"user_id": user_id})
         return UserResponse.from_user(user)
 
-    @handle_unchecked_errors
     async def get_by_email(self, email: str) -> Optional[UserResponse]:
         redacted_email = email if email is None else email[:3] + "***"
         logger.debug("Fetching user by email", extra={"email": redacted_email})
@@ -46,39 +53,48 @@ class UserService:
         logger.info("User fetched by email", extra={"email": redacted_email})
         return UserResponse.from_user(user)
 
-    @handle_unchecked_errors
     async def authenticate_user(self, credentials: UserCredentials) -> User:
         redacted_email = credentials.email[:3] + "***"
         logger.debug("Authenticating user", extra={"email": redacted_email})
         stmt = select(User).where(User.email == credentials.email)
         user = (await self.db.execute(stmt)).scalar_one_or_none()
-        if not user or not verify_password(user.hashed_password, credentials.password):
+        verified, new_hash = verify_and_update_password(user.hashed_password, credentials.password) if user else (False, None)
+        if not verified:
             logger.warning("Authentication failed", extra={"email": redacted_email})
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid credentials"
             )
+        if new_hash is not None:
+            # Older (bcrypt) hash: store the argon2id one now that we have the plain password
+            user.hashed_password = new_hash
+            self.db.add(user)
+            await self.db.commit()
+            logger.info("Upgraded password hash", extra={"user_id": user.id})
         logger.info("Authentication successful", extra={"user_id": user.id, "email": redacted_email})
         return user
 
-    @handle_unchecked_errors
     async def create_user(self, payload: UserCreate) -> UserResponse:
         redacted_email = payload.email[:3] + "***"
         logger.debug("Creating user", extra={"username": payload.username, "email": redacted_email})
-        if user := await self.get_by_email(str(payload.email)):
+        hashed_password = hash_password(payload.password)
+        # The unique email and username indexes decide; no preflight lookup, and no race between two signups
+        stmt = (
+            pg_insert(User)
+            .values(username=payload.username, email=str(payload.email), hashed_password=hashed_password)
+            .on_conflict_do_nothing()
+            .returning(User)
+        )
+        user = (await self.db.execute(stmt)).scalar_one_or_none()
+        if user is None:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
-                detail="User with this email already exists"
+                detail="User with this email or username already exists"
             )
-        hashed_password = hash_password(payload.password)
-        user = User(username=payload.username, email=payload.email, hashed_password=hashed_password)
-        self.db.add(user)
         await self.db.commit()
-        await self.db.refresh(user)
         logger.info("User created", extra={"user_id": user.id, "username": user.username, "email": redacted_email})
         return UserResponse.from_user(user)
 
-    @handle_unchecked_errors
     async def login_user(self, payload: UserCredentials) -> Token:
         user = await self.authenticate_user(payload)
         if not user:
@@ -89,10 +105,9 @@ class UserService:
         claims = JWTClaims.new(user.id)
         access_token = create_jwt(claims)
         refresh_token = create_refresh_token()
-        await self.token_service.create_refresh_token(refresh_token)
+        await self.token_service.create_refresh_token(refresh_token, user.id)
         return Token(access_token=access_token, refresh_token=refresh_token)
 
-    @handle_unchecked_errors
     async def logout_user(self, access_token: str, user_id: str):
         await self.token_service.blacklist_token(access_token, user_id)
 
@@ -2,38 +2,102 @@ import jwt
 from passlib.context import CryptContext
 from app.dependencies.config import get_settings
 from app.schemas.auth import JWTClaims
+from app.utils.caching import BlacklistFilter, PasswordCache
+import re
 import secrets
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional, Tuple
 from app.config.logging import logger
 
 settings = get_settings()
 
-context = CryptContext(schemes=['bcrypt'], deprecated='auto')
+# Three base64url segments within sane bounds; anything else is rejected before PyJWT sees it
+_JWT_SHAPE_RE = re.compile(r"[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+")
+JWT_MIN_LENGTH = 40
+JWT_MAX_LENGTH = 4096
+
+# New hashes use argon2id; bcrypt hashes still verify and are rehashed on the next login.
+# Costs are pinned so passlib never has to pick them per call.
+context = CryptContext(
+    schemes=['argon2', 'bcrypt'],
+    deprecated='auto',
+    argon2__type='ID',
+    argon2__time_cost=3,
+    argon2__memory_cost=65536,
+    argon2__parallelism=2,
+    bcrypt__rounds=12
+)
+
+@lru_cache(maxsize=1)
+def get_password_cache() -> Optional[PasswordCache]:
+    # None when disabled; a changed password has a new hash, so it never matches an old entry
+    if not settings.auth.password_cache_enabled:
+        return None
+    return PasswordCache(
+        secret=settings.auth.hash_secret_key.get_secret_value().encode("utf-8"),
+        max_entries=settings.auth.password_cache_max_entries,
+        ttl_seconds=settings.auth.password_cache_ttl_seconds
+    )
+
+@lru_cache(maxsize=1)
+def get_blacklist_filter() -> Optional[BlacklistFilter]:
+    # Shared by every request in the process; None when disabled
+    if not settings.auth.blacklist_filter_enabled:
+        return None
+    return BlacklistFilter(
+        token_lifetime_seconds=settings.auth.jwt_expiration_hours * 3600,
+        capacity=settings.auth.blacklist_filter_capacity,
+        error_rate=settings.auth.blacklist_filter_error_rate,
+        sync_interval_seconds=settings.auth.blacklist_filter_sync_seconds
+    )
 
 def hash_password(password: str) -> str:
     logger.debug("Hashing password")
     return context.hash(password)
 
 def verify_password(hashed_password: str, password: str) -> bool:
+    return verify_and_update_password(hashed_password, password)[0]
+
+def verify_and_update_password(hashed_password: str, password: str) -> Tuple[bool, Optional[str]]:
+    """Check a password; the second item is a replacement hash when the stored one is outdated."""
+    password_cache = get_password_cache()
+    if password_cache is not None and password_cache.contains(hashed_password, password):
+        logger.debug("Password verified from cache")
+        return True, None
     logger.debug("Verifying password")
-    return context.verify(password, hashed_password)
+    verified, new_hash = context.verify_and_update(password, hashed_password)
+    if verified and password_cache is not None:
+        password_cache.add(new_hash or hashed_password, password)
+    return verified, new_hash
 
 def create_jwt(data: JWTClaims) -> str:
     logger.debug("Creating JWT", extra={"sub": getattr(data, 'sub', None)})
+    jwt_config = settings.auth.jwt_config
     return jwt.encode(
         data.to_jwt_payload(),
-        key=settings.auth.jwt_secret_key.get_secret_value(),
-        algorithm=settings.auth.jwt_algorithm
+        key=jwt_config["secret_key"],
+        algorithm=jwt_config["algorithm"]
     )
 
 def decode_jwt(token: str) -> JWTClaims:
-    logger.debug("Decoding JWT", extra={"token_prefix": token[:8] + "...", "alg": settings.auth.jwt_algorithm})
+    if not JWT_MIN_LENGTH < len(token) < JWT_MAX_LENGTH or _JWT_SHAPE_RE.fullmatch(token) is None:
+        raise jwt.InvalidTokenError("Malformed token")
+    jwt_config = settings.auth.jwt_config
+    logger.opt(lazy=True).debug("Decoding JWT", extra=lambda: {"token_prefix": token[:8] + "...", "alg": jwt_config["algorithm"]})
     decoded_data = jwt.decode(
         token,
-        key=settings.auth.jwt_secret_key.get_secret_value(),
-        algorithms=[settings.auth.jwt_algorithm]
+        key=jwt_config["secret_key"],
+        algorithms=[jwt_config["algorithm"]]
+    )
+    logger.opt(lazy=True).debug("Decoded JWT claims", extra=lambda: {"keys": list(decoded_data.keys())})
+    # The signature already vouches for the claims and jwt.decode has checked exp, so skip
+    # model validation; only the timestamps need converting the way validation would
+    return JWTClaims.model_construct(
+        sub=decoded_data["sub"],
+        exp=datetime.fromtimestamp(decoded_data["exp"], tz=timezone.utc),
+        iat=datetime.fromtimestamp(decoded_data["iat"], tz=timezone.utc)
     )
-    logger.debug("Decoded JWT claims", extra={"keys": list(decoded_data.keys())})
-    return JWTClaims(**decoded_data)
 
 def create_refresh_token() -> str:
     token = secrets.token_urlsafe(32)
@@ -0,0 +1,75 @@
+from app.schemas.document import DocumentOperationResult, SearchRequest, SearchResponse
+from app.services.document import DocumentService
+from typing import List, Optional, Tuple
+import asyncio
+from app.config.logging import logger
+
+
+class QueryBatcher:
+    """Coalesce concurrent similarity searches into one batched DocumentService call.
+
+    The first queued request opens a short window; everything that arrives before it closes,
+    up to max_batch_size, is embedded in a single model call.
+    """
+
+    def __init__(self, service: DocumentService, max_batch_size: int = 16, max_wait_ms: float = 20.0):
+        self.service = service
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def submit(self, request: SearchRequest) -> SearchResponse | DocumentOperationResult:
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((request, future))
+        return await future
+
+    def _ensure_worker(self) -> None:
+        # Started lazily so the worker always runs on the loop serving requests
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def _collect_batch(self) -> List[Tuple[SearchRequest, asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect_batch()
+            # Callers that gave up while waiting don't need a search
+            batch = [(request, future) for request, future in batch if not future.done()]
+            if not batch:
+                continue
+            logger.debug("Dispatching search batch", extra={"batch_size": len(batch)})
+            try:
+                results = await self.service.similarity_search_batch([request for request, _ in batch])
+            except Exception as e:
+                logger.exception("Search batch failed", extra={"batch_size": len(batch)})
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    async def close(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
@@ -0,0 +1,378 @@
+from app.schemas.auth import UserResponse
+from app.schemas.document import SearchRequest, SearchResponse
+from collections import OrderedDict
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+import hashlib
+import hmac
+import itertools
+import json
+import math
+import sqlite3
+import threading
+import time
+import numpy as np
+from app.config.logging import logger
+
+
+class SearchCache:
+    """In-process LRU cache of search responses, keyed on the normalized request and expired after a TTL."""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, SearchResponse]]" = OrderedDict()
+
+    @staticmethod
+    def make_key(request: SearchRequest) -> str:
+        # Case and whitespace differences don't change what the user is asking for
+        normalized_query = " ".join(request.query.casefold().split())
+        payload = json.dumps(
+            [
+                normalized_query, request.k, request.filters, request.include_scores,
+                request.include_metadata, request.mmr, request.fetch_k
+            ],
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def get(self, request: SearchRequest) -> Optional[SearchResponse]:
+        key = self.make_key(request)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return response
+
+    def set(self, request: SearchRequest, response: SearchResponse) -> None:
+        key = self.make_key(request)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        if self._entries:
+            logger.debug("Clearing search cache", extra={"entries": len(self._entries)})
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SemanticSearchCache:
+    """In-process LRU of search responses matched by query-embedding similarity.
+
+    Only requests with the same k, filters and include flags can share an entry, so a
+    paraphrase never returns another user's (or another filter's) results. Embeddings are
+    kept int8-quantized with a per-vector scale, a quarter of the fp32 footprint.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300.0, threshold: float = 0.95):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self._ids = itertools.count()
+        self._entries: "OrderedDict[int, Tuple[str, float, np.ndarray, float, SearchResponse]]" = OrderedDict()
+        self._scopes: Dict[str, Set[int]] = {}
+
+    @staticmethod
+    def make_scope(request: SearchRequest) -> str:
+        payload = json.dumps(
+            [request.k, request.filters, request.include_scores, request.include_metadata, request.mmr, request.fetch_k],
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    @classmethod
+    def _quantize(cls, embedding: Sequence[float]) -> Tuple[np.ndarray, float]:
+        # Symmetric int8 with scale = max|v| / 127; the rounding error is far below the hit threshold
+        vector = cls._normalize(embedding)
+        scale = float(np.abs(vector).max(initial=0.0)) / 127
+        if not scale:
+            return np.zeros(vector.shape, dtype=np.int8), 0.0
+        return np.rint(vector / scale).astype(np.int8), scale
+
+    def get(self, request: SearchRequest, embedding: Sequence[float]) -> Optional[SearchResponse]:
+        entry_ids = self._scopes.get(self.make_scope(request))
+        if not entry_ids:
+            return None
+        now = time.monotonic()
+        live: List[int] = []
+        for entry_id in list(entry_ids):
+            if self._entries[entry_id][1] <= now:
+                self._remove(entry_id)
+            else:
+                live.append(entry_id)
+        if not live:
+            return None
+
+        # Cosine similarity against every live entry in one matrix-vector product over the int8 codes
+        codes = np.stack([self._entries[entry_id][2] for entry_id in live])
+        scales = np.fromiter((self._entries[entry_id][3] for entry_id in live), dtype=np.float32, count=len(live))
+        similarities = (codes @ self._normalize(embedding)) * scales
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            return None
+        entry_id = live[best]
+        self._entries.move_to_end(entry_id)
+        cached = self._entries[entry_id][4]
+        # Same results, but the caller's own query text goes into the prompt
+        return SearchResponse.model_construct(
+            query=request.query,
+            results=cached.results,
+            total_found=cached.total_found,
+            search_time_ms=cached.search_time_ms
+        )
+
+    def set(self, request: SearchRequest, embedding: Sequence[float], response: SearchResponse) -> None:
+        scope = self.make_scope(request)
+        entry_id = next(self._ids)
+        codes, scale = self._quantize(embedding)
+        self._entries[entry_id] = (scope, time.monotonic() + self.ttl_seconds, codes, scale, response)
+        self._scopes.setdefault(scope, set()).add(entry_id)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, entry_id: int) -> None:
+        scope = self._entries.pop(entry_id)[0]
+        entry_ids = self._scopes[scope]
+        entry_ids.discard(entry_id)
+        if not entry_ids:
+            del self._scopes[scope]
+
+    def clear(self) -> None:
+        if self._entries:
+            logger.debug("Clearing semantic search cache", extra={"entries": len(self._entries)})
+        self._entries.clear()
+        self._scopes.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class PasswordCache:
+    """In-process LRU of recently verified (password hash, password) pairs, expired after a TTL.
+
+    Only successful checks are stored, keyed on an HMAC under a server secret, so neither the
+    password nor anything that could be brute-forced offline is held in memory.
+    """
+
+    def __init__(self, secret: bytes, max_entries: int = 10_000, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._secret = secret
+        self._entries: "OrderedDict[bytes, float]" = OrderedDict()
+
+    def make_key(self, hashed_password: str, password: str) -> bytes:
+        message = hashlib.sha256(password.encode("utf-8")).digest() + hashed_password.encode("utf-8")
+        return hmac.new(self._secret, message, hashlib.sha256).digest()
+
+    def contains(self, hashed_password: str, password: str) -> bool:
+        key = self.make_key(hashed_password, password)
+        expires_at = self._entries.get(key)
+        if expires_at is None:
+            return False
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return False
+        self._entries.move_to_end(key)
+        return True
+
+    def add(self, hashed_password: str, password: str) -> None:
+        key = self.make_key(hashed_password, password)
+        self._entries[key] = time.monotonic() + self.ttl_seconds
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class BlacklistFilter:
+    """In-process Bloom filter over blacklisted access tokens, so live tokens skip the blacklist lookup.
+
+    A miss is definitive only while the filter is in sync with the shared blacklist; callers
+    pull new entries once sync_interval_seconds has passed. Entries live in two generations
+    rotated every token lifetime, so a token is remembered for at least as long as it stays
+    valid and the filter never fills up.
+    """
+
+    def __init__(
+        self,
+        token_lifetime_seconds: float,
+        capacity: int = 100_000,
+        error_rate: float = 1e-4,
+        sync_interval_seconds: float = 5.0
+    ):
+        self.token_lifetime_seconds = token_lifetime_seconds
+        self.sync_interval_seconds = sync_interval_seconds
+        # Standard sizing: m = -n ln p / (ln 2)^2 bits and k = (m / n) ln 2 hashes
+        self._bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self._hashes = max(1, round(self._bits / capacity * math.log(2)))
+        self._current = bytearray((self._bits + 7) // 8)
+        self._previous = bytearray(len(self._current))
+        self._rotated_at = time.monotonic()
+        self._synced_at: Optional[float] = None
+        # Wall-clock time the last sync read the blacklist up to
+        self.synced_through: Optional[datetime] = None
+
+    def _positions(self, token: str) -> List[int]:
+        # Double hashing over one digest stands in for k independent hash functions
+        digest = hashlib.sha256(token.encode("utf-8")).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:16], "little") | 1
+        return [(first + i * second) % self._bits for i in range(self._hashes)]
+
+    def _rotate(self) -> None:
+        now = time.monotonic()
+        if now - self._rotated_at >= self.token_lifetime_seconds:
+            # Anything in the older generation has outlived every token it could match
+            self._previous, self._current = self._current, bytearray(len(self._current))
+            self._rotated_at = now
+
+    def add(self, token: str) -> None:
+        self._rotate()
+        for position in self._positions(token):
+            self._current[position >> 3] |= 1 << (position & 7)
+
+    def might_contain(self, token: str) -> bool:
+        self._rotate()
+        positions = self._positions(token)
+        return any(
+            all(bits[position >> 3] & (1 << (position & 7)) for position in positions)
+            for bits in (self._current, self._previous)
+        )
+
+    def needs_sync(self) -> bool:
+        return self._synced_at is None or time.monotonic() - self._synced_at >= self.sync_interval_seconds
+
+    def mark_synced(self, through: datetime) -> None:
+        self._synced_at = time.monotonic()
+        self.synced_through = through
+
+    def clear(self) -> None:
+        self._current = bytearray(len(self._current))
+        self._previous = bytearray(len(self._current))
+        self._synced_at = None
+        self.synced_through = None
+
+
+class EmbeddingCache:
+    """SQLite table of embeddings keyed on a hash of the model and text, so re-ingested chunks skip the embeddings API.
+
+    Holds at most max_entries rows; once over, the oldest writes are dropped first.
+    """
+
+    # Keys per SELECT, well under SQLite's bound-parameter limit
+    LOOKUP_CHUNK_SIZE = 500
+
+    def __init__(self, path: Union[str, Path], max_entries: int = 50_000):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # Shared by the worker threads ingestion runs on; the lock serializes its use
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("CREATE TABLE IF NOT EXISTS emb_cache (key TEXT PRIMARY KEY, vec BLOB NOT NULL)")
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}:{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+        unique_keys = list(dict.fromkeys(keys))
+        with self._lock:
+            for start in range(0, len(unique_keys), self.LOOKUP_CHUNK_SIZE):
+                chunk = unique_keys[start:start + self.LOOKUP_CHUNK_SIZE]
+                with closing(self._connection.execute(
+                    f"SELECT key, vec FROM emb_cache WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk
+                )) as cursor:
+                    for key, vec in cursor:
+                        found[key] = np.frombuffer(vec, dtype=np.float32).tolist()
+        return found
+
+    def set_many(self, items: Iterable[Tuple[str, Sequence[float]]]) -> None:
+        rows = [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items]
+        if not rows:
+            return
+        with self._lock, self._connection:
+            self._connection.executemany("INSERT OR REPLACE INTO emb_cache (key, vec) VALUES (?, ?)", rows)
+            # REPLACE gives rewritten keys a fresh rowid, so rowid order is write order
+            self._connection.execute(
+                "DELETE FROM emb_cache WHERE rowid <= "
+                "(SELECT rowid FROM emb_cache ORDER BY rowid DESC LIMIT 1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM emb_cache").fetchone()[0]
+
+
+class AuthCache:
+    """In-process LRU of users resolved from access tokens, expired after a TTL or shortly before the token itself."""
+
+    # Entries stop being served this many seconds before the token's exp
+    EXPIRY_MARGIN_SECONDS = 5.0
+
+    def __init__(self, max_entries: int = 10_000, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[bytes, Tuple[float, UserResponse]]" = OrderedDict()
+
+    @staticmethod
+    def make_key(token: str) -> bytes:
+        # Fixed-size digest, so raw bearer tokens are never held as keys
+        return hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+
+    def get(self, token: str) -> Optional[UserResponse]:
+        key = self.make_key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, user = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return user
+
+    def set(self, token: str, user: UserResponse, token_expires_at: float) -> None:
+        expires_at = min(time.time() + self.ttl_seconds, token_expires_at - self.EXPIRY_MARGIN_SECONDS)
+        if expires_at <= time.time():
+            return
+        key = self.make_key(token)
+        self._entries[key] = (expires_at, user)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard(self, token: str) -> None:
+        self._entries.pop(self.make_key(token), None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
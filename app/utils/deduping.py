@@ -1,40 +1,59 @@
 from app.schemas.document import SearchResponse
 from app.services.document import DocumentService
-from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
-from typing import List, Set
+from typing import Set
 import asyncio
+import hashlib
 from fastapi import HTTPException, status
 from app.config.logging import logger
 
 
+def _mark_exact_duplicates(response: SearchResponse, redundant: bytearray) -> None:
+    # Identical chunk text needs no embeddings to spot; keep the first (best ranked) copy
+    seen: Set[bytes] = set()
+    for position, result in enumerate(response.results):
+        digest = hashlib.md5(result.content.encode("utf-8"), usedforsecurity=False).digest()
+        if digest in seen:
+            redundant[position] = 1
+        else:
+            seen.add(digest)
+
+
 def _sync_get_redundant_chunk_ids(
     response: SearchResponse, 
     service: DocumentService,
     threshold: float = 0.8
-) -> List[str]:
-    redundant_ids: Set[str] = set()
-    doc_ids = [result.doc_metadata.uuid for result in response.results]
-    logger.debug("Computing similarity matrix for deduping", extra={"doc_count": len(doc_ids), "threshold": threshold})
-    embeddings = np.array(service.get_embeddings(doc_ids))
-    similarity_matrix = cosine_similarity(embeddings)
-    
-    for i in range(len(similarity_matrix)):
-        for j in range(i + 1, len(similarity_matrix)):  # Skip diagonal and duplicates
-            if similarity_matrix[i][j] > threshold:
-                redundant_ids.add(doc_ids[j])  # Remove the later one, keep the first
+) -> Set[str]:
+    results = response.results
+    # One flag per result position, so marking a chunk never hashes its uuid
+    redundant = bytearray(len(results))
+    _mark_exact_duplicates(response, redundant)
+    candidates = [position for position in range(len(results)) if not redundant[position]]
+    if len(candidates) >= 2:
+        doc_ids = [results[position].doc_metadata.uuid for position in candidates]
+        logger.debug("Computing similarity matrix for deduping", extra={"doc_count": len(doc_ids), "threshold": threshold})
+        # Rows come back L2-normalized, so cosine similarity is a single float32 GEMM; asarray
+        # is free for the service's own arrays and keeps other inputs from promoting to float64
+        embeddings = np.asarray(service.get_embeddings(doc_ids), dtype=np.float32)
+        similarity_matrix = embeddings @ embeddings.T
+
+        # A chunk is redundant when it is too close to any earlier (better ranked) one: any hit
+        # in its column above the diagonal. Keeps the first, removes the later ones.
+        for j in np.flatnonzero(np.triu(similarity_matrix > np.float32(threshold), k=1).any(axis=0)):
+            redundant[candidates[j]] = 1
+
+    redundant_ids = {results[position].doc_metadata.uuid for position in range(len(results)) if redundant[position]}
     logger.info("Deduping completed", extra={"redundant_count": len(redundant_ids)})
-    
-    return list(redundant_ids)
+    return redundant_ids
 
 async def get_redundant_chunk_ids(
     response: SearchResponse, 
     service: DocumentService,
     threshold: float = 0.8
-) -> List[str]:
+) -> Set[str]:
     if not response.results:
         logger.debug("No results to dedupe")
-        return []
+        return set()
     
     try:
         result = await asyncio.to_thread(
@@ -1,43 +1,19 @@
-from typing import Union, Awaitable, Callable
-import asyncio
-from typing import ParamSpec, TypeVar
-from fastapi import HTTPException, status
-from functools import wraps
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
 from app.config.logging import logger
 
-P = ParamSpec('P')
-R = TypeVar('R')
 
-def handle_unchecked_errors(func: Callable[P, R]) -> Callable[P, R]:
-    @wraps(func)
-    async def async_wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
-        try:
-            result = await func(*args, **kwargs)
-            return result
-        except HTTPException:
-            raise
-        except Exception as e:
-            logger.exception(f"Unchecked exception in {func.__name__}: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="An internal server error occurred"
-            ) from e
-    
-    @wraps(func)
-    def sync_wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
-        try:
-            result = func(*args, **kwargs)
-            return result
-        except HTTPException:
-            raise
-        except Exception as e:
-            logger.exception(f"Unchecked exception in {func.__name__}: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="An internal server error occurred"
-            ) from e
-    
-    if asyncio.iscoroutinefunction(func):
-        return async_wrapper
-    else:
-        return sync_wrapper
\ No newline at end of file
+async def unhandled_exception_handler(request: Request, exc: Exception) -> JSONResponse:
+    """Log anything a route let escape and answer with a generic 500, without leaking details."""
+    logger.opt(exception=exc).error(
+        f"Unchecked exception in {request.method} {request.url.path}: {str(exc)}"
+    )
+    return JSONResponse(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        content={"detail": "An internal server error occurred"}
+    )
+
+
+def register_exception_handlers(app: FastAPI) -> None:
+    """Install the app-wide handlers; HTTPException keeps FastAPI's own handler."""
+    app.add_exception_handler(Exception, unhandled_exception_handler)
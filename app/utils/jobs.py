@@ -0,0 +1,29 @@
+from app.schemas.document import IngestionJob
+from collections import OrderedDict
+from typing import Any, Optional
+import uuid
+
+
+class IngestionJobStore:
+    """In-process record of background ingestion jobs, keeping the most recent max_entries."""
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+
+    def create(self, owner_id: str, source_file: str) -> IngestionJob:
+        job = IngestionJob(job_id=str(uuid.uuid4()), owner_id=owner_id, source_file=source_file)
+        self._jobs[job.job_id] = job
+        while len(self._jobs) > self.max_entries:
+            self._jobs.popitem(last=False)
+        return job
+
+    def update(self, job_id: str, **changes: Any) -> Optional[IngestionJob]:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        job = self._jobs[job_id] = job.model_copy(update=changes)
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        return self._jobs.get(job_id)
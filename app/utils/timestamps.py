@@ -0,0 +1,8 @@
+from datetime import datetime, timezone
+
+
+def to_unix_ms(value: datetime) -> int:
+    """Milliseconds since the epoch; naive datetimes are taken as UTC, like the stored added_at."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
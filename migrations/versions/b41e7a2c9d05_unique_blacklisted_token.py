@@ -0,0 +1,36 @@
+"""Unique blacklisted token
+
+Revision ID: b41e7a2c9d05
+Revises: 7c2f4d9a8b31
+Create Date: 2026-10-16 14:27:03.518442
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b41e7a2c9d05'
+down_revision: Union[str, None] = '7c2f4d9a8b31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rows raced in by the old select-then-insert would block the unique index; keep one of each
+    op.execute(
+        "DELETE FROM blacklisted_tokens "
+        "WHERE id NOT IN (SELECT MIN(id) FROM blacklisted_tokens GROUP BY token)"
+    )
+    op.drop_index('ix_blacklisted_tokens_token_hash', table_name='blacklisted_tokens', postgresql_using='hash')
+    op.create_index('ix_blacklisted_tokens_token', 'blacklisted_tokens', ['token'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_blacklisted_tokens_token', table_name='blacklisted_tokens')
+    op.create_index('ix_blacklisted_tokens_token_hash', 'blacklisted_tokens', ['token'], unique=False, postgresql_using='hash')
@@ -0,0 +1,42 @@
+"""Back-fill the numeric added_at_ms metadata field on chunks stored before it existed.
+
+Run from the project root:  python -m scripts.backfill_added_at_ms
+"""
+from datetime import datetime
+
+from app.config import get_settings
+from app.config.logging import logger
+from app.services.document import get_chroma_client
+from app.utils.timestamps import to_unix_ms
+
+PAGE_SIZE = 500
+
+
+def backfill() -> int:
+    settings = get_settings()
+    collection = get_chroma_client(str(settings.vectors.chroma_persist_dir)).get_collection(
+        settings.vectors.chroma_collection_name
+    )
+
+    updated = 0
+    offset = 0
+    while True:
+        page = collection.get(include=["metadatas"], limit=PAGE_SIZE, offset=offset)
+        if not page["ids"]:
+            break
+        ids, metadatas = [], []
+        for chunk_id, metadata in zip(page["ids"], page["metadatas"]):
+            if metadata and metadata.get("added_at") and "added_at_ms" not in metadata:
+                ids.append(chunk_id)
+                metadatas.append({**metadata, "added_at_ms": to_unix_ms(datetime.fromisoformat(metadata["added_at"]))})
+        if ids:
+            collection.update(ids=ids, metadatas=metadatas)
+            updated += len(ids)
+        offset += PAGE_SIZE
+
+    logger.info("Back-filled added_at_ms", extra={"updated": updated})
+    return updated
+
+
+if __name__ == "__main__":
+    backfill()
@@ -65,7 +65,7 @@ def main():
         return run_command([
             "python3", "-m", "pytest", 
             "tests/test_document_service.py",
-            "--cov=app.services.documents",
+            "--cov=app.services.document",
             "--cov-report=term-missing",
             "--cov-report=html:htmlcov",
             "-v"
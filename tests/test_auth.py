@@ -0,0 +1,46 @@
+import pytest
+from fastapi import HTTPException
+from unittest.mock import AsyncMock, Mock
+
+from app.dependencies.auth import get_current_user
+from app.schemas.auth import UserResponse
+from app.utils.caching import AuthCache
+
+
+class TestGetCurrentUser:
+    """Test suite for the get_current_user dependency."""
+
+    @pytest.fixture
+    def cache(self):
+        """Auth cache already holding a user for the token."""
+        cache = AuthCache()
+        cache.set("token", UserResponse(id="user-123", username="tester", email="tester@example.com"), float("inf"))
+        return cache
+
+    @pytest.fixture
+    def service(self):
+        """Mock user service whose blacklist check reports the token as live."""
+        service = Mock()
+        service.token_service.is_token_blacklisted = AsyncMock(return_value=False)
+        return service
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_cached_user_is_served_after_blacklist_check(self, cache, service):
+        """Test that a cache hit still asks whether the token was revoked."""
+        user = await get_current_user(service=service, cache=cache, token="token")
+
+        assert user.id == "user-123"
+        service.token_service.is_token_blacklisted.assert_awaited_once_with("token")
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_token_revoked_elsewhere_is_rejected_and_evicted(self, cache, service):
+        """Test that a token logged out on another worker is not served from the cache."""
+        service.token_service.is_token_blacklisted.return_value = True
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_user(service=service, cache=cache, token="token")
+
+        assert exc_info.value.status_code == 401
+        assert cache.get("token") is None
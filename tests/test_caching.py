@@ -0,0 +1,234 @@
+import pytest
+import numpy as np
+from datetime import datetime
+from unittest.mock import patch
+
+from app.schemas.auth import UserResponse
+from app.schemas.document import SearchRequest, SearchResponse
+from app.utils.caching import AuthCache, BlacklistFilter, EmbeddingCache, PasswordCache, SearchCache, SemanticSearchCache
+
+
+class TestSearchCache:
+    """Test suite for SearchCache class."""
+
+    @pytest.fixture
+    def response(self):
+        """Sample search response for caching."""
+        return SearchResponse(query="what is rag", results=[], total_found=0)
+
+    @pytest.mark.unit
+    def test_normalized_query_hits_cache(self, response):
+        """Test that case and whitespace differences share a cache entry."""
+        cache = SearchCache()
+        cache.set(SearchRequest(query="What is  RAG"), response)
+
+        assert cache.get(SearchRequest(query="what is rag")) is response
+        assert cache.get(SearchRequest(query="what is rag", k=10)) is None
+        assert cache.get(SearchRequest(query="what is rag", filters={"owner_id": "other"})) is None
+        assert cache.get(SearchRequest(query="what is rag", include_metadata=False)) is None
+
+    @pytest.mark.unit
+    def test_expired_entries_are_dropped(self, response):
+        """Test that entries older than the TTL are not returned."""
+        cache = SearchCache(ttl_seconds=10)
+        request = SearchRequest(query="what is rag")
+
+        with patch("app.utils.caching.time.monotonic", return_value=100.0):
+            cache.set(request, response)
+        with patch("app.utils.caching.time.monotonic", return_value=111.0):
+            assert cache.get(request) is None
+        assert len(cache) == 0
+
+    @pytest.mark.unit
+    def test_least_recently_used_entry_is_evicted(self, response):
+        """Test that the cache stays within max_entries."""
+        cache = SearchCache(max_entries=2)
+        first, second, third = (SearchRequest(query=q) for q in ("one", "two", "three"))
+
+        cache.set(first, response)
+        cache.set(second, response)
+        cache.get(first)
+        cache.set(third, response)
+
+        assert cache.get(first) is response
+        assert cache.get(second) is None
+        assert cache.get(third) is response
+
+
+class TestSemanticSearchCache:
+    """Test suite for SemanticSearchCache class."""
+
+    @pytest.fixture
+    def response(self):
+        """Sample search response for caching."""
+        return SearchResponse(query="what is rag", results=[], total_found=0, search_time_ms=12.0)
+
+    @pytest.mark.unit
+    def test_similar_query_hits_with_callers_query(self, response):
+        """Test that a near-identical embedding is served, carrying the new query text."""
+        cache = SemanticSearchCache(threshold=0.95)
+        cache.set(SearchRequest(query="what is rag"), [1.0, 0.0], response)
+
+        cached = cache.get(SearchRequest(query="what's RAG?"), [0.99, 0.05])
+
+        assert cached is not None
+        assert cached.query == "what's RAG?"
+        assert cached.results is response.results
+        assert cache.get(SearchRequest(query="unrelated"), [0.0, 1.0]) is None
+
+    @pytest.mark.unit
+    def test_different_scope_misses(self, response):
+        """Test that k and filters must match for a semantic hit."""
+        cache = SemanticSearchCache()
+        cache.set(SearchRequest(query="what is rag", filters={"owner_id": "a"}), [1.0, 0.0], response)
+
+        assert cache.get(SearchRequest(query="what is rag", filters={"owner_id": "b"}), [1.0, 0.0]) is None
+        assert cache.get(SearchRequest(query="what is rag", k=10, filters={"owner_id": "a"}), [1.0, 0.0]) is None
+
+    @pytest.mark.unit
+    def test_expired_and_evicted_entries_are_dropped(self, response):
+        """Test TTL expiry and the max_entries bound."""
+        cache = SemanticSearchCache(max_entries=1, ttl_seconds=10)
+        with patch("app.utils.caching.time.monotonic", return_value=100.0):
+            cache.set(SearchRequest(query="one"), [1.0, 0.0], response)
+            cache.set(SearchRequest(query="two"), [0.0, 1.0], response)
+            assert len(cache) == 1
+            assert cache.get(SearchRequest(query="one"), [1.0, 0.0]) is None
+        with patch("app.utils.caching.time.monotonic", return_value=111.0):
+            assert cache.get(SearchRequest(query="two"), [0.0, 1.0]) is None
+        assert len(cache) == 0
+
+    @pytest.mark.unit
+    def test_quantized_embeddings_keep_cosine_similarity(self):
+        """Test that int8 codes with a per-vector scale reproduce cosine similarity closely."""
+        vector = np.random.default_rng(0).standard_normal(1536)
+        codes, scale = SemanticSearchCache._quantize(vector)
+
+        assert codes.dtype == np.int8
+        assert float(codes @ (vector / np.linalg.norm(vector))) * scale == pytest.approx(1.0, abs=1e-3)
+
+
+class TestPasswordCache:
+    """Test suite for PasswordCache class."""
+
+    @pytest.mark.unit
+    def test_verified_pair_is_remembered_until_ttl(self):
+        """Test that only the exact hash and password pair hits, and only until the TTL passes."""
+        cache = PasswordCache(secret=b"secret", ttl_seconds=60)
+
+        with patch("app.utils.caching.time.monotonic", return_value=100.0):
+            cache.add("hash", "correct horse")
+            assert cache.contains("hash", "correct horse")
+            assert not cache.contains("hash", "wrong horse")
+            assert not cache.contains("new-hash", "correct horse")
+        with patch("app.utils.caching.time.monotonic", return_value=161.0):
+            assert not cache.contains("hash", "correct horse")
+
+    @pytest.mark.unit
+    def test_keys_depend_on_secret(self):
+        """Test that the cache key is an HMAC under the server secret."""
+        assert PasswordCache(b"one").make_key("hash", "pw") != PasswordCache(b"two").make_key("hash", "pw")
+
+
+class TestBlacklistFilter:
+    """Test suite for BlacklistFilter class."""
+
+    @pytest.mark.unit
+    def test_added_tokens_are_found_and_others_mostly_are_not(self):
+        """Test that added tokens always match and unseen tokens stay near the target error rate."""
+        blacklist_filter = BlacklistFilter(token_lifetime_seconds=3600, capacity=1000, error_rate=1e-3)
+        for i in range(1000):
+            blacklist_filter.add(f"revoked-{i}")
+
+        assert all(blacklist_filter.might_contain(f"revoked-{i}") for i in range(1000))
+        assert sum(blacklist_filter.might_contain(f"live-{i}") for i in range(10_000)) < 50
+
+    @pytest.mark.unit
+    def test_tokens_survive_one_lifetime_then_rotate_out(self):
+        """Test that entries outlive the tokens they match and are dropped after two rotations."""
+        with patch("app.utils.caching.time.monotonic", return_value=0.0):
+            blacklist_filter = BlacklistFilter(token_lifetime_seconds=100)
+            blacklist_filter.add("revoked")
+        with patch("app.utils.caching.time.monotonic", return_value=150.0):
+            assert blacklist_filter.might_contain("revoked")
+        with patch("app.utils.caching.time.monotonic", return_value=260.0):
+            assert not blacklist_filter.might_contain("revoked")
+
+    @pytest.mark.unit
+    def test_needs_sync_after_interval(self):
+        """Test that the filter asks for a sync until synced and again after the interval."""
+        blacklist_filter = BlacklistFilter(token_lifetime_seconds=3600, sync_interval_seconds=5)
+        assert blacklist_filter.needs_sync()
+
+        with patch("app.utils.caching.time.monotonic", return_value=100.0):
+            blacklist_filter.mark_synced(datetime(2025, 1, 1))
+            assert not blacklist_filter.needs_sync()
+        with patch("app.utils.caching.time.monotonic", return_value=106.0):
+            assert blacklist_filter.needs_sync()
+
+
+class TestEmbeddingCache:
+    """Test suite for EmbeddingCache class."""
+
+    @pytest.mark.unit
+    def test_stored_vectors_survive_reopen(self, tmp_path):
+        """Test that embeddings are found again by model and text after reopening the database."""
+        path = tmp_path / "embedding_cache.sqlite3"
+        key = EmbeddingCache.make_key("model-a", "chunk text")
+        EmbeddingCache(path).set_many([(key, [0.5, -0.25])])
+
+        cache = EmbeddingCache(path)
+
+        assert cache.get_many([key, EmbeddingCache.make_key("model-b", "chunk text")]) == {key: [0.5, -0.25]}
+        assert len(cache) == 1
+
+    @pytest.mark.unit
+    def test_oldest_writes_are_dropped_past_max_entries(self, tmp_path):
+        """Test that the table stays within max_entries, keeping the most recent writes."""
+        cache = EmbeddingCache(tmp_path / "embedding_cache.sqlite3", max_entries=2)
+        keys = [EmbeddingCache.make_key("model-a", text) for text in ("one", "two", "three")]
+        cache.set_many([(keys[0], [1.0]), (keys[1], [2.0])])
+        cache.set_many([(keys[0], [1.0])])
+        cache.set_many([(keys[2], [3.0])])
+
+        assert len(cache) == 2
+        assert cache.get_many(keys) == {keys[0]: [1.0], keys[2]: [3.0]}
+
+
+class TestAuthCache:
+    """Test suite for AuthCache class."""
+
+    @pytest.fixture
+    def user(self):
+        """Sample resolved user."""
+        return UserResponse(id="user-123", username="tester", email="tester@example.com")
+
+    @pytest.mark.unit
+    def test_cached_user_is_returned_until_ttl(self, user):
+        """Test that a cached user is served until the cache TTL passes."""
+        cache = AuthCache(ttl_seconds=60)
+
+        with patch("app.utils.caching.time.time", return_value=1000.0):
+            cache.set("token", user, token_expires_at=5000.0)
+            assert cache.get("token") is user
+        with patch("app.utils.caching.time.time", return_value=1061.0):
+            assert cache.get("token") is None
+
+    @pytest.mark.unit
+    def test_entries_expire_before_the_token(self, user):
+        """Test that entries never outlive the token's own expiry."""
+        cache = AuthCache(ttl_seconds=60)
+
+        with patch("app.utils.caching.time.time", return_value=1000.0):
+            cache.set("token", user, token_expires_at=1020.0)
+        with patch("app.utils.caching.time.time", return_value=1016.0):
+            assert cache.get("token") is None
+
+    @pytest.mark.unit
+    def test_discard_removes_token(self, user):
+        """Test that a logged out token is no longer served."""
+        cache = AuthCache()
+        cache.set("token", user, token_expires_at=float("inf"))
+        cache.discard("token")
+
+        assert cache.get("token") is None
@@ -1,8 +1,10 @@
+import io
 import os
 from unittest.mock import patch
 import pytest
 from pydantic import ValidationError
 from app.dependencies import get_settings
+from app.config.base import parse_env
 from app.config import (
     AuthSettings,
     DocumentSettings,
@@ -53,6 +55,14 @@ class TestEnvironmentSettings:
         assert config["port"] == 9000
         assert config["reload"] is True
         assert config["debug"] is True
+    
+    def test_allowed_origins_from_env(self):
+        """Test comma-separated and JSON list origins from the environment."""
+        with patch.dict(os.environ, {"ALLOWED_ORIGINS": "https://a.example, https://b.example"}):
+            assert EnvironmentSettings().allowed_origins == ["https://a.example", "https://b.example"]
+        
+        with patch.dict(os.environ, {"ALLOWED_ORIGINS": '["https://a.example"]'}):
+            assert EnvironmentSettings().allowed_origins == ["https://a.example"]
 
 
 class TestDocumentSettings:
@@ -274,7 +284,7 @@ class TestAuthSettings:
         assert settings.is_valid_api_key("invalid") is False
         
         # Should return True if not required
-        settings.api_key_required = False
+        settings = AuthSettings(api_key_required=False, api_keys=["key1", "key2"])
         assert settings.is_valid_api_key("anything") is True
 
 
@@ -377,6 +387,18 @@ class TestMasterSettings:
             assert "redis" in config
             assert "logging" in config
     
+    def test_model_dump_json(self):
+        """Test JSON configuration export."""
+        import json
+        
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+            settings = Settings()
+            config = json.loads(settings.model_dump_json())
+            
+            # Should have all sections, with secrets masked
+            assert set(config) == set(settings.model_dump())
+            assert config["llm"]["openai_api_key"] == "**********"
+    
     def test_settings_isolation(self):
         """Test that each settings section loads from its own env file."""
         # This test would be more meaningful with actual env files,
@@ -424,4 +446,60 @@ class TestEnvFileIntegration:
             
             # Should use default values
             assert settings.llm.chat_model == "gpt-4o-mini"
-            assert settings.vectors.vector_db_type == "chroma"
\ No newline at end of file
+            assert settings.vectors.vector_db_type == "chroma"
+
+
+class TestEnvFileParsing:
+    """Test the shared env file parser."""
+    
+    def test_parse_plain_and_quoted_values(self):
+        """Test plain, quoted, and exported assignments."""
+        values = parse_env(
+            "# comment\n"
+            "DB_URL=postgresql://localhost/db\n"
+            "export API_HOST = 127.0.0.1\n"
+            "QUOTED=\"hello world\" # trailing comment\n"
+            "SINGLE='a b'\n"
+            "EMPTY=\n"
+        )
+        
+        assert values["DB_URL"] == "postgresql://localhost/db"
+        assert values["API_HOST"] == "127.0.0.1"
+        assert values["QUOTED"] == "hello world"
+        assert values["SINGLE"] == "a b"
+        assert values["EMPTY"] == ""
+    
+    def test_parse_comments_and_escapes(self):
+        """Test inline comments and double-quoted escapes."""
+        values = parse_env('HASH=abc#def\nSPACED=abc #comment\nESC="a\\nb"\n')
+        
+        assert values["HASH"] == "abc#def"
+        assert values["SPACED"] == "abc"
+        assert values["ESC"] == "a\nb"
+    
+    def test_parse_variable_expansion(self):
+        """Test ${VAR} expansion with defaults."""
+        values = parse_env("BASE=/data\nPATH_A=${BASE}/a\nPATH_B=${MISSING_VAR_FOR_TEST:-/tmp}\n")
+        
+        assert values["PATH_A"] == "/data/a"
+        assert values["PATH_B"] == "/tmp"
+    
+    def test_parse_comment_after_closing_quote_and_bare_key(self):
+        """Test a comment right after a closing quote, and a key with no assignment."""
+        values = parse_env('QUOTED = "q"#c\nSINGLE=\'s\'#c\nBARE=ab"#c\nFLAG\nBLANK= #c\n')
+        
+        assert values["QUOTED"] == "q"
+        assert values["SINGLE"] == "s"
+        assert values["BARE"] == 'ab"#c'
+        assert "FLAG" in values and values["FLAG"] is None
+        assert values["BLANK"] == ""
+    
+    def test_parse_matches_python_dotenv(self):
+        """Test that the parser agrees with python-dotenv across quoting, comments, and expansion."""
+        dotenv = pytest.importorskip("dotenv")
+        data = (
+            'A = "q"#c\nB\nexport C\nD=\'x\' # y\nE=ab"#c\nF=a #c\nG=\nH="a\\nb"\n'
+            "I=${B:-default}\nJ=${MISSING_VAR_FOR_TEST:-default}\nK = x y z # c\nL=#c\nM= #c\r\n"
+        )
+        
+        assert parse_env(data) == dict(dotenv.dotenv_values(stream=io.StringIO(data)))
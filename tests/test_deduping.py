@@ -0,0 +1,78 @@
+import pytest
+import numpy as np
+from unittest.mock import AsyncMock, Mock
+from langchain_core.documents import Document
+
+from app.dependencies.chat import dedupe_chunks, get_relevant_chunks
+from app.schemas.document import DocumentMetadata, SearchRequest, SearchResponse, SearchResult
+from app.services.document import DocumentService
+from app.utils.deduping import get_redundant_chunk_ids
+
+
+def _result(uuid: str, content: str) -> SearchResult:
+    return SearchResult(
+        content=content,
+        doc_metadata=DocumentMetadata(uuid=uuid, owner_id="owner"),
+        relevance_score=0.9
+    )
+
+
+class TestDeduping:
+    """Test suite for redundant chunk detection."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_exact_duplicates_skip_embedding_lookup(self):
+        """Test that identical chunk text is deduped without fetching embeddings."""
+        service = Mock()
+        response = SearchResponse(
+            query="query",
+            results=[_result("a", "same text"), _result("b", "same text")],
+            total_found=2
+        )
+
+        redundant_ids = await get_redundant_chunk_ids(response, service)
+
+        assert redundant_ids == {"b"}
+        service.get_embeddings.assert_not_called()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_similar_embeddings_keep_first_result(self):
+        """Test that near-duplicate embeddings drop the later, lower ranked chunk."""
+        service = Mock()
+        service.get_embeddings = Mock(return_value=np.array([[1.0, 0.0], [0.9999, 0.01], [0.0, 1.0]], dtype=np.float32))
+        response = SearchResponse(
+            query="query",
+            results=[_result("a", "first"), _result("b", "second"), _result("c", "third")],
+            total_found=3
+        )
+
+        redundant_ids = await get_redundant_chunk_ids(response, service)
+
+        assert isinstance(redundant_ids, set)
+        assert redundant_ids == {"b"}
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_client_cannot_turn_off_metadata_for_chat(self):
+        """Test that include_metadata=False from the client still yields metadata the dedupe step can read."""
+        documents = [
+            Document(page_content="same text", metadata={"uuid": "a"}),
+            Document(page_content="same text", metadata={"uuid": "b"})
+        ]
+
+        async def submit(request):
+            results = [DocumentService._to_search_result(document, 0.9, request.include_metadata) for document in documents]
+            return SearchResponse(query=request.query, results=results, total_found=len(results))
+
+        batcher = Mock(submit=AsyncMock(side_effect=submit))
+        response = await get_relevant_chunks(
+            batcher=batcher,
+            cache=None,
+            query=SearchRequest(query="query", include_metadata=False)
+        )
+        deduped = await dedupe_chunks(service=Mock(), response=response)
+
+        assert batcher.submit.await_args.args[0].include_metadata
+        assert [result.doc_metadata.uuid for result in deduped.results] == ["a"]
@@ -1,5 +1,6 @@
 import pytest
 import asyncio
+import numpy as np
 from unittest.mock import Mock, patch, AsyncMock
 from datetime import datetime
 from typing import List
@@ -17,6 +18,7 @@ from app.schemas.document import (
     CollectionStats
 )
 from langchain_core.documents import Document
+from app.utils.caching import EmbeddingCache, SemanticSearchCache
 
 
 class TestDocumentService:
@@ -25,7 +27,7 @@ class TestDocumentService:
     @pytest.fixture
     def mock_embeddings(self):
         """Mock OpenAI embeddings."""
-        with patch('app.services.documents.OpenAIEmbeddings') as mock:
+        with patch('app.services.document.OpenAIEmbeddings') as mock:
             mock_instance = Mock()
             mock_instance.model = "text-embedding-ada-002"
             mock.return_value = mock_instance
@@ -34,7 +36,8 @@ class TestDocumentService:
     @pytest.fixture
     def mock_chroma(self):
         """Mock Chroma vector store."""
-        with patch('app.services.documents.Chroma') as mock:
+        with patch('app.services.document.Chroma') as mock, \
+                patch('app.services.document.get_chroma_client'):
             mock_instance = Mock()
             mock_instance._collection.name = "test_collection"
             mock.return_value = mock_instance
@@ -55,6 +58,7 @@ class TestDocumentService:
         """Sample document metadata for testing."""
         return DocumentMetadata(
             uuid="test-uuid-123",
+            owner_id="test-owner-123",
             source_file="test_document.pdf",
             file_name="test_document.pdf",
             chunk_index=0,
@@ -116,8 +120,13 @@ class TestDocumentService:
     @pytest.mark.asyncio
     async def test_add_documents_success(self, document_service, sample_document):
         """Test successful multiple documents addition."""
-        documents = [sample_document, sample_document]
-        document_service.store.aadd_documents = AsyncMock(return_value=["doc-1", "doc-2"])
+        documents = [
+            Document(page_content=sample_document.page_content, metadata={**sample_document.metadata, "uuid": f"doc-{i}"})
+            for i in (1, 2)
+        ]
+        document_service._encoding = Mock(encode_batch=Mock(return_value=[[0] * 10, [0] * 10]))
+        document_service.embeddings.aembed_documents = AsyncMock(return_value=[[0.1, 0.2], [0.3, 0.4]])
+        document_service.store._collection.add = Mock()
         
         result = await document_service.add_documents(documents)
         
@@ -126,13 +135,74 @@ class TestDocumentService:
         assert result.added_count == 2
         assert result.uuids == ["doc-1", "doc-2"]
         assert "Successfully added documents" in result.message
+        document_service.store._collection.add.assert_called_once_with(
+            ids=["doc-1", "doc-2"],
+            embeddings=[[0.1, 0.2], [0.3, 0.4]],
+            documents=[sample_document.page_content, sample_document.page_content],
+            metadatas=[documents[0].metadata, documents[1].metadata]
+        )
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_add_documents_writes_batches_in_order(self, document_service, sample_document):
+        """Test that pipelined batches are written in input order even when embeddings finish out of order."""
+        documents = [
+            Document(page_content=f"chunk {i}", metadata={**sample_document.metadata, "uuid": f"doc-{i}"})
+            for i in range(3)
+        ]
+        document_service._encoding = Mock(encode_batch=Mock(return_value=[[0] * 5000] * 3))
+
+        async def embed(texts):
+            # Later batches finish first
+            await asyncio.sleep(0.01 * (3 - int(texts[0].split()[1])))
+            return [[0.1, 0.2]] * len(texts)
+
+        document_service.embeddings.aembed_documents = embed
+        document_service.store._collection.add = Mock()
+
+        result = await document_service.add_documents(documents)
+
+        assert result.success is True
+        assert result.uuids == ["doc-0", "doc-1", "doc-2"]
+        assert [call.kwargs["ids"] for call in document_service.store._collection.add.call_args_list] == [["doc-0"], ["doc-1"], ["doc-2"]]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_add_documents_reuses_cached_embeddings(self, document_service, sample_document, tmp_path):
+        """Test that only chunk text missing from the embedding cache is sent to the embeddings API."""
+        document_service.embedding_cache = EmbeddingCache(tmp_path / "embedding_cache.sqlite3")
+        document_service.embedding_cache.set_many([(EmbeddingCache.make_key("text-embedding-ada-002", "seen"), [0.5, 0.5])])
+        documents = [
+            Document(page_content=text, metadata={**sample_document.metadata, "uuid": text})
+            for text in ("seen", "new")
+        ]
+        document_service._encoding = Mock(encode_batch=Mock(return_value=[[0] * 10, [0] * 10]))
+        document_service.embeddings.aembed_documents = AsyncMock(return_value=[[0.25, 0.75]])
+        document_service.store._collection.add = Mock()
+
+        result = await document_service.add_documents(documents)
+
+        assert result.success is True
+        document_service.embeddings.aembed_documents.assert_awaited_once_with(["new"])
+        assert document_service.store._collection.add.call_args.kwargs["embeddings"] == [[0.5, 0.5], [0.25, 0.75]]
+        assert len(document_service.embedding_cache) == 2
+
+    @pytest.mark.unit
+    def test_batch_by_tokens(self, document_service, sample_document):
+        """Test documents are grouped in order without exceeding the token budget."""
+        document_service._encoding = Mock(encode_batch=Mock(return_value=[[0] * 4, [0] * 4, [0] * 3, [0] * 9]))
+
+        batches = document_service._batch_by_tokens([sample_document] * 4, max_tokens=8)
+
+        assert [len(batch) for batch in batches] == [2, 1, 1]
 
     @pytest.mark.unit
     @pytest.mark.asyncio
     async def test_add_documents_failure(self, document_service, sample_document):
         """Test multiple documents addition failure."""
         documents = [sample_document]
-        document_service.store.aadd_documents = AsyncMock(side_effect=Exception("Storage error"))
+        document_service._encoding = Mock(encode_batch=Mock(return_value=[[0] * 10]))
+        document_service.embeddings.aembed_documents = AsyncMock(side_effect=Exception("Storage error"))
         
         result = await document_service.add_documents(documents)
         
@@ -167,20 +237,20 @@ class TestDocumentService:
     @pytest.mark.asyncio
     async def test_delete_document_success(self, document_service):
         """Test successful document deletion."""
-        document_service.store.adelete = AsyncMock()
+        document_service.store.delete = Mock()
         
         result = await document_service.delete_document("doc-123")
         
         assert isinstance(result, DocumentOperationResult)
         assert result.success is True
         assert "Successfully deleted document" in result.message
-        document_service.store.adelete.assert_called_once_with(["doc-123"])
+        document_service.store.delete.assert_called_once_with(["doc-123"])
 
     @pytest.mark.unit
     @pytest.mark.asyncio
     async def test_delete_document_failure(self, document_service):
         """Test document deletion failure."""
-        document_service.store.adelete = AsyncMock(side_effect=Exception("Delete error"))
+        document_service.store.delete = Mock(side_effect=Exception("Delete error"))
         
         result = await document_service.delete_document("doc-123")
         
@@ -193,7 +263,7 @@ class TestDocumentService:
     async def test_delete_documents_success(self, document_service):
         """Test successful multiple documents deletion."""
         document_ids = ["doc-1", "doc-2", "doc-3"]
-        document_service.store.adelete = AsyncMock()
+        document_service.store.delete = Mock()
         
         result = await document_service.delete_documents(document_ids)
         
@@ -201,14 +271,14 @@ class TestDocumentService:
         assert result.success is True
         assert result.deleted_count == 3
         assert "Successfully deleted 3 documents" in result.message
-        document_service.store.adelete.assert_called_once_with(document_ids)
+        document_service.store.delete.assert_called_once_with(document_ids)
 
     @pytest.mark.unit
     @pytest.mark.asyncio
     async def test_delete_documents_failure(self, document_service):
         """Test multiple documents deletion failure."""
         document_ids = ["doc-1", "doc-2"]
-        document_service.store.adelete = AsyncMock(side_effect=Exception("Delete error"))
+        document_service.store.delete = Mock(side_effect=Exception("Delete error"))
         
         result = await document_service.delete_documents(document_ids)
         
@@ -228,14 +298,17 @@ class TestDocumentService:
                 {"source_file": "test.pdf"}
             ]
         })
-        document_service.store.adelete = AsyncMock()
+        document_service.store._collection.delete = Mock()
         
-        result = await document_service.delete_by_source("test.pdf")
+        result = await document_service.delete_by_source("test.pdf", "test-owner-123")
         
         assert isinstance(result, DeleteDocumentResult)
         assert result.success is True
         assert result.deleted_count == 2
         assert "test.pdf" in result.message
+        where = {"$and": [{"source_file": {"$eq": "test.pdf"}}, {"owner_id": {"$eq": "test-owner-123"}}]}
+        document_service.store.get.assert_called_once_with(where=where, include=[])
+        document_service.store._collection.delete.assert_called_once_with(where=where)
 
     @pytest.mark.unit
     @pytest.mark.asyncio
@@ -243,7 +316,7 @@ class TestDocumentService:
         """Test deletion by source file when no documents exist."""
         document_service.store.get = Mock(return_value={"ids": []})
         
-        result = await document_service.delete_by_source("nonexistent.pdf")
+        result = await document_service.delete_by_source("nonexistent.pdf", "test-owner-123")
         
         assert isinstance(result, DeleteDocumentResult)
         assert result.success is True
@@ -252,14 +325,18 @@ class TestDocumentService:
     @pytest.mark.unit
     def test_clear_collection_success(self, document_service):
         """Test successful collection clearing."""
-        document_service.store.delete_collection = Mock()
-        
-        result = document_service.clear_collection()
+        old_store = document_service.store
+        old_store.delete_collection = Mock()
+        new_store = Mock()
+
+        with patch.object(document_service, "_open_store", return_value=new_store):
+            result = document_service.clear_collection()
         
         assert isinstance(result, DocumentOperationResult)
         assert result.success is True
         assert "Successfully deleted collection" in result.message
-        document_service.store.delete_collection.assert_called_once()
+        old_store.delete_collection.assert_called_once()
+        assert document_service.store is new_store
 
     @pytest.mark.unit
     def test_clear_collection_failure(self, document_service):
@@ -272,17 +349,35 @@ class TestDocumentService:
         assert result.success is False
         assert "Failed to delete collection" in result.message
 
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_writes_wait_for_clear_collection(self, document_service, sample_document):
+        """Test that batch writes and deletes don't touch the store while the collection is being reset."""
+        document_service.store.delete = Mock()
+        with document_service._write_lock:
+            write = asyncio.ensure_future(asyncio.to_thread(document_service._write_batch, [sample_document], [[0.1]]))
+            delete = asyncio.ensure_future(document_service.delete_document("doc-123"))
+            await asyncio.sleep(0.05)
+            document_service.store._collection.add.assert_not_called()
+            document_service.store.delete.assert_not_called()
+        await asyncio.gather(write, delete)
+
+        document_service.store._collection.add.assert_called_once()
+        document_service.store.delete.assert_called_once_with(["doc-123"])
+
     @pytest.mark.unit
     @pytest.mark.asyncio
     async def test_similarity_search_with_scores(self, document_service, sample_metadata):
         """Test similarity search with relevance scores."""
-        mock_docs_with_scores = [
-            (Document(page_content="Test content 1", metadata=sample_metadata.model_dump()), 0.9),
-            (Document(page_content="Test content 2", metadata=sample_metadata.model_dump()), 0.8)
+        mock_docs_with_distances = [
+            (Document(page_content="Test content 1", metadata=sample_metadata.model_dump()), 0.1),
+            (Document(page_content="Test content 2", metadata=sample_metadata.model_dump()), 0.2)
         ]
-        document_service.store.asimilarity_search_with_relevance_scores = AsyncMock(
-            return_value=mock_docs_with_scores
+        document_service.embeddings.aembed_query = AsyncMock(return_value=[0.1, 0.2])
+        document_service.store.similarity_search_by_vector_with_relevance_scores = Mock(
+            return_value=mock_docs_with_distances
         )
+        document_service.store._select_relevance_score_fn = Mock(return_value=lambda distance: 1.0 - distance)
         
         request = SearchRequest(
             query="test query",
@@ -298,16 +393,23 @@ class TestDocumentService:
         assert result.results[0].relevance_score == 0.9
         assert result.results[1].relevance_score == 0.8
         assert result.total_found == 2
+        document_service.embeddings.aembed_query.assert_awaited_once_with("test query")
+        document_service.store.similarity_search_by_vector_with_relevance_scores.assert_called_once_with(
+            embedding=[0.1, 0.2],
+            k=2,
+            filter=None
+        )
 
     @pytest.mark.unit
     @pytest.mark.asyncio
     async def test_similarity_search_without_scores(self, document_service, sample_metadata):
         """Test similarity search without relevance scores."""
         mock_docs = [
-            Document(page_content="Test content 1", metadata=sample_metadata.model_dump()),
-            Document(page_content="Test content 2", metadata=sample_metadata.model_dump())
+            (Document(page_content="Test content 1", metadata=sample_metadata.model_dump()), 0.1),
+            (Document(page_content="Test content 2", metadata=sample_metadata.model_dump()), 0.2)
         ]
-        document_service.store.asimilarity_search = AsyncMock(return_value=mock_docs)
+        document_service.embeddings.aembed_query = AsyncMock(return_value=[0.1, 0.2])
+        document_service.store.similarity_search_by_vector_with_relevance_scores = Mock(return_value=mock_docs)
         
         request = SearchRequest(
             query="test query",
@@ -323,11 +425,47 @@ class TestDocumentService:
         assert result.results[0].relevance_score is None
         assert result.total_found == 2
 
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_similarity_search_without_metadata(self, document_service, sample_metadata):
+        """Test similarity search skips metadata when the request opts out."""
+        document_service.embeddings.aembed_query = AsyncMock(return_value=[0.1, 0.2])
+        document_service.store.similarity_search_by_vector_with_relevance_scores = Mock(return_value=[
+            (Document(page_content="Test content 1", metadata=sample_metadata.model_dump()), 0.1)
+        ])
+        document_service.store._select_relevance_score_fn = Mock(return_value=lambda distance: 1.0 - distance)
+
+        result = await document_service.similarity_search(SearchRequest(query="test query", include_metadata=False))
+
+        assert result.results[0].content == "Test content 1"
+        assert result.results[0].doc_metadata is None
+        assert result.results[0].relevance_score == 0.9
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_similarity_search_mmr_skips_near_duplicates(self, document_service):
+        """Test MMR search prefers a diverse result over a near-duplicate of the top hit."""
+        document_service.embeddings.aembed_query = AsyncMock(return_value=[1.0, 0.05, 0.0])
+        document_service.store._collection.query = Mock(return_value={
+            "documents": [["top", "near duplicate", "different"]],
+            "metadatas": [[{"uuid": "a"}, {"uuid": "b"}, {"uuid": "c"}]],
+            "distances": [[0.0, 0.01, 0.4]],
+            "embeddings": [[[0.99, 0.01, 0.0], [1.0, 0.0, 0.0], [0.7, 0.7, 0.0]]]
+        })
+        document_service.store._select_relevance_score_fn = Mock(return_value=lambda distance: 1.0 - distance)
+
+        result = await document_service.similarity_search(SearchRequest(query="test query", k=2, mmr=True, fetch_k=3))
+
+        assert [r.content for r in result.results] == ["top", "different"]
+        assert result.results[1].relevance_score == pytest.approx(0.6)
+        assert document_service.store._collection.query.call_args.kwargs["n_results"] == 3
+
     @pytest.mark.unit
     @pytest.mark.asyncio
     async def test_similarity_search_failure(self, document_service):
         """Test similarity search failure."""
-        document_service.store.asimilarity_search = AsyncMock(side_effect=Exception("Search error"))
+        document_service.embeddings.aembed_query = AsyncMock(return_value=[0.1, 0.2])
+        document_service.store.similarity_search_by_vector_with_relevance_scores = Mock(side_effect=Exception("Search error"))
         
         request = SearchRequest(query="test query", k=5)
         
@@ -337,23 +475,94 @@ class TestDocumentService:
         assert result.success is False
         assert "Failed to search collection" in result.message
 
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_similarity_search_batch(self, document_service, sample_metadata):
+        """Test batched similarity search embeds all queries in one call."""
+        document_service.embeddings.aembed_documents = AsyncMock(return_value=[[0.1, 0.2], [0.3, 0.4]])
+        document_service.store.similarity_search_by_vector_with_relevance_scores = Mock(return_value=[
+            (Document(page_content="Test content", metadata=sample_metadata.model_dump()), 0.25)
+        ])
+        document_service.store._select_relevance_score_fn = Mock(return_value=lambda distance: 1.0 - distance)
+
+        requests = [
+            SearchRequest(query="first query", k=1, include_scores=True),
+            SearchRequest(query="second query", k=1, include_scores=False)
+        ]
+
+        results = await document_service.similarity_search_batch(requests)
+
+        document_service.embeddings.aembed_documents.assert_awaited_once_with(["first query", "second query"])
+        assert [result.query for result in results] == ["first query", "second query"]
+        assert results[0].results[0].relevance_score == 0.75
+        assert results[1].results[0].relevance_score is None
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_similarity_search_batch_embedding_failure(self, document_service):
+        """Test batched similarity search failure returns a result per request."""
+        document_service.embeddings.aembed_documents = AsyncMock(side_effect=Exception("Embedding error"))
+
+        results = await document_service.similarity_search_batch([
+            SearchRequest(query="first query"),
+            SearchRequest(query="second query")
+        ])
+
+        assert len(results) == 2
+        assert all(isinstance(result, DocumentOperationResult) for result in results)
+        assert all(result.success is False for result in results)
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_similarity_search_semantic_cache_hit(self, document_service, sample_metadata):
+        """Test that a semantic cache hit skips the vector search and writes clear the cache."""
+        document_service.semantic_cache = SemanticSearchCache()
+        document_service.embeddings.aembed_query = AsyncMock(return_value=[0.1, 0.2])
+        document_service.store.similarity_search_by_vector_with_relevance_scores = Mock(return_value=[
+            (Document(page_content="Test content", metadata=sample_metadata.model_dump()), 0.25)
+        ])
+        document_service.store._select_relevance_score_fn = Mock(return_value=lambda distance: 1.0 - distance)
+
+        await document_service.similarity_search(SearchRequest(query="first query", k=1))
+        result = await document_service.similarity_search(SearchRequest(query="first query again", k=1))
+
+        assert result.query == "first query again"
+        assert result.total_found == 1
+        document_service.store.similarity_search_by_vector_with_relevance_scores.assert_called_once()
+
+        document_service.store.delete = Mock()
+        await document_service.delete_documents(["doc-1"])
+        assert len(document_service.semantic_cache) == 0
+
+    @pytest.mark.unit
+    def test_get_embeddings_normalized_in_request_order(self, document_service):
+        """Test that embeddings come back as normalized float32 rows in the order of the requested ids."""
+        document_service.store._collection.get = Mock(return_value={
+            "ids": ["a", "c"],
+            "embeddings": np.array([[3.0, 4.0], [0.0, 2.0]])
+        })
+
+        embeddings = document_service.get_embeddings(["c", "b", "a"])
+
+        assert embeddings.dtype == np.float32
+        np.testing.assert_allclose(embeddings, [[0.0, 1.0], [0.0, 0.0], [0.6, 0.8]])
+
     @pytest.mark.unit
     def test_get_document_count(self, document_service):
         """Test getting document count."""
-        document_service.store.get = Mock(return_value={
-            "ids": ["doc-1", "doc-2", "doc-3"],
-            "metadatas": [{}, {}, {}]
-        })
+        document_service.store._collection.count = Mock(return_value=3)
+        document_service.store.get = Mock()
         
         count = document_service.get_document_count()
         
         assert count == 3
-        document_service.store.get.assert_called_once_with(include=["metadatas"])
+        document_service.store._collection.count.assert_called_once_with()
+        document_service.store.get.assert_not_called()
 
     @pytest.mark.unit
     def test_get_document_count_empty(self, document_service):
         """Test getting document count when collection is empty."""
-        document_service.store.get = Mock(return_value={"ids": []})
+        document_service.store._collection.count = Mock(return_value=0)
         
         count = document_service.get_document_count()
         
@@ -377,6 +586,30 @@ class TestDocumentService:
         assert "file1.pdf" in sources
         assert "file2.pdf" in sources
 
+    @pytest.mark.unit
+    def test_list_sources_cached_until_count_changes(self, document_service):
+        """Test that repeat listings reuse the cached sources while the record count is unchanged."""
+        document_service.store._collection.count = Mock(return_value=1)
+        document_service.store.get = Mock(return_value={"ids": ["doc-1"], "metadatas": [{"source_file": "file1.pdf"}]})
+
+        assert document_service.list_sources() == ["file1.pdf"]
+        assert document_service.list_sources() == ["file1.pdf"]
+        assert document_service.store.get.call_count == 1
+
+        document_service.store._collection.count = Mock(return_value=2)
+        document_service.list_sources()
+        assert document_service.store.get.call_count == 2
+
+    @pytest.mark.unit
+    def test_list_sources_scans_when_sql_finds_nothing(self, document_service):
+        """Test that an empty SQL result for a non-empty collection falls back to the metadata scan."""
+        document_service.store._collection.count = Mock(return_value=1)
+        document_service.store.get = Mock(return_value={"ids": ["doc-1"], "metadatas": [{"source_file": "file1.pdf"}]})
+
+        with patch.object(document_service, "_distinct_sources_sql", return_value=[]):
+            assert document_service.list_sources() == ["file1.pdf"]
+        document_service.store.get.assert_called_once()
+
     @pytest.mark.unit
     def test_list_sources_empty(self, document_service):
         """Test listing sources when no documents exist."""
@@ -0,0 +1,80 @@
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, patch
+
+from app.config.logging import logger
+from app.utils.errors import register_exception_handlers, unhandled_exception_handler
+
+
+class TestExceptionHandlers:
+    """Test suite for the app-wide exception handlers."""
+
+    @pytest.fixture
+    def client(self):
+        """Client for a throwaway app with the handlers registered."""
+        app = FastAPI()
+        register_exception_handlers(app)
+
+        @app.get("/boom")
+        async def boom():
+            raise RuntimeError("secret detail")
+
+        @app.get("/missing")
+        async def missing():
+            raise HTTPException(404, "Not here")
+
+        # Starlette re-raises after the handler answers; only the response matters here
+        return TestClient(app, raise_server_exceptions=False)
+
+    @pytest.fixture
+    def messages(self):
+        """Error-level log records emitted while the test runs."""
+        messages = []
+        handler_id = logger.add(messages.append, level="ERROR", format="{message}")
+        yield messages
+        logger.remove(handler_id)
+
+    @pytest.mark.unit
+    def test_unhandled_exception_is_logged_and_hidden(self, client, messages):
+        """Test that an escaped exception becomes a generic 500 and is logged with its traceback."""
+        response = client.get("/boom")
+
+        assert response.status_code == 500
+        assert response.json() == {"detail": "An internal server error occurred"}
+        assert len(messages) == 1
+        assert "GET /boom: secret detail" in messages[0]
+        assert messages[0].record["exception"].type is RuntimeError
+
+    @pytest.mark.unit
+    def test_http_exceptions_keep_their_response(self, client, messages):
+        """Test that HTTPException is still answered by FastAPI's own handler."""
+        response = client.get("/missing")
+
+        assert response.status_code == 404
+        assert response.json() == {"detail": "Not here"}
+        assert messages == []
+
+
+class TestCreateApp:
+    """Test suite for the create_app factory."""
+
+    @pytest.mark.unit
+    def test_create_app_registers_handlers(self):
+        """Test that the app factory installs the catch-all handler."""
+        from app.main import create_app
+
+        with patch("app.main.setup_logging"):
+            app = create_app()
+
+        assert app.exception_handlers[Exception] is unhandled_exception_handler
+
+    @pytest.mark.unit
+    def test_create_app_warms_pool_on_startup(self):
+        """Test that starting the app opens the database pool before serving."""
+        from app.main import create_app
+
+        with patch("app.main.setup_logging"), \
+                patch("app.dependencies.database.warm_up_pool", new_callable=AsyncMock) as warm_up_pool:
+            with TestClient(create_app()):
+                warm_up_pool.assert_awaited_once()
@@ -0,0 +1,59 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from app.schemas.document import SearchRequest, SearchResponse
+from app.utils.batching import QueryBatcher
+
+
+class TestQueryBatcher:
+    """Test suite for QueryBatcher class."""
+
+    @pytest.fixture
+    def service(self):
+        """Mock DocumentService answering each batched request in order."""
+        service = Mock()
+        service.similarity_search_batch = AsyncMock(side_effect=lambda requests: [
+            SearchResponse(query=request.query, results=[], total_found=0)
+            for request in requests
+        ])
+        return service
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_a_batch(self, service):
+        """Test that requests arriving within the window are searched together."""
+        batcher = QueryBatcher(service, max_batch_size=8, max_wait_ms=50)
+
+        results = await asyncio.gather(*(
+            batcher.submit(SearchRequest(query=f"query {i}")) for i in range(3)
+        ))
+        await batcher.close()
+
+        service.similarity_search_batch.assert_awaited_once()
+        assert [result.query for result in results] == ["query 0", "query 1", "query 2"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_batches_are_capped_at_max_size(self, service):
+        """Test that a full batch is dispatched without waiting for more requests."""
+        batcher = QueryBatcher(service, max_batch_size=2, max_wait_ms=50)
+
+        results = await asyncio.gather(*(
+            batcher.submit(SearchRequest(query=f"query {i}")) for i in range(3)
+        ))
+        await batcher.close()
+
+        assert service.similarity_search_batch.await_count == 2
+        assert len(results) == 3
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_batch_failure_propagates_to_callers(self, service):
+        """Test that a failing batch raises in every waiting caller."""
+        service.similarity_search_batch = AsyncMock(side_effect=RuntimeError("boom"))
+        batcher = QueryBatcher(service, max_wait_ms=0)
+
+        with pytest.raises(RuntimeError):
+            await batcher.submit(SearchRequest(query="query"))
+        await batcher.close()
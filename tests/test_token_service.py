@@ -0,0 +1,89 @@
+import pytest
+import time
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, Mock, patch
+
+from app.services.token import TokenService
+
+
+def _claims(expires_in_seconds: float) -> Mock:
+    """Decoded claims with an exp the given number of seconds from now."""
+    return Mock(exp=datetime.fromtimestamp(time.time() + expires_in_seconds, tz=timezone.utc))
+
+
+class TestTokenServiceBlacklist:
+    """Test suite for the blacklist paths of TokenService."""
+
+    @pytest.fixture
+    def db(self):
+        """Mock async session whose EXISTS query reports the token as blacklisted."""
+        db = AsyncMock()
+        db.execute.return_value = Mock(scalar=Mock(return_value=True))
+        return db
+
+    @pytest.fixture
+    def redis(self):
+        """Mock Redis client with no keys."""
+        redis = AsyncMock()
+        redis.exists.return_value = 0
+        return redis
+
+    @pytest.fixture
+    def blacklist_filter(self):
+        """In-sync mock Bloom filter that answers "maybe" for every token."""
+        return Mock(needs_sync=Mock(return_value=False), might_contain=Mock(return_value=True))
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_redis_miss_falls_back_to_database_and_writes_back(self, db, redis, blacklist_filter):
+        """Test that a lost Redis key is recovered from the database and restored with a TTL."""
+        service = TokenService(db, redis, blacklist_filter)
+
+        with patch("app.services.token.decode_jwt", return_value=_claims(600)):
+            assert await service.is_token_blacklisted("token")
+
+        db.execute.assert_awaited_once()
+        key, _ = redis.set.await_args.args
+        assert key == TokenService._blacklist_key("token")
+        assert 0 < redis.set.await_args.kwargs["ex"] <= 600
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_redis_hit_skips_database(self, db, redis, blacklist_filter):
+        """Test that a Redis hit answers without a query."""
+        redis.exists.return_value = 1
+
+        assert await TokenService(db, redis, blacklist_filter).is_token_blacklisted("token")
+        db.execute.assert_not_awaited()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_without_filter_redis_is_skipped(self, db, redis):
+        """Test that without a Bloom filter lookups go straight to the database."""
+        db.execute.return_value = Mock(scalar=Mock(return_value=False))
+
+        assert not await TokenService(db, redis).is_token_blacklisted("token")
+        db.execute.assert_awaited_once()
+        redis.exists.assert_not_awaited()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_live_token_is_not_written_to_redis(self, db, redis, blacklist_filter):
+        """Test that only blacklisted tokens are cached."""
+        db.execute.return_value = Mock(scalar=Mock(return_value=False))
+
+        assert not await TokenService(db, redis, blacklist_filter).is_token_blacklisted("token")
+        redis.set.assert_not_awaited()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_redis_failure_after_commit_does_not_fail_blacklisting(self, db, redis, blacklist_filter):
+        """Test that a failed Redis write is logged rather than turned into an error."""
+        db.execute.return_value = Mock(scalar_one_or_none=Mock(return_value="row-id"))
+        redis.set.side_effect = ConnectionError("redis is down")
+
+        with patch("app.services.token.decode_jwt", return_value=_claims(600)):
+            await TokenService(db, redis, blacklist_filter).blacklist_token("token", "user-123")
+
+        db.commit.assert_awaited_once()
+        redis.set.assert_awaited_once()